@@ -0,0 +1,91 @@
+"""
+Compare the date-bucketed dedupe in scripts/dedupe.py with the original
+pairwise scan. Rows are synthesised from the per-site CSVs in data/.
+
+    python benchmarks/bench_dedupe.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import csv
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from dedupe import names_similar, unique_events  # noqa: E402
+
+LEGACY_LIMIT = 5000
+
+
+def legacy_unique(rows: list, threshold: float = 1) -> list:
+    unique: list = []
+    for row in rows:
+        if not row.date or not row.name:
+            continue
+        if not any(
+            existing.date == row.date and names_similar(existing.name, row.name, threshold)
+            for existing in unique
+        ):
+            unique.append(row)
+    return unique
+
+
+def load_names() -> list[str]:
+    names = []
+    for path in (ROOT / "data" / "events_latino_ch.csv", ROOT / "data" / "events-bachata-bern.csv"):
+        with path.open(newline="", encoding="utf-8") as handle:
+            names.extend(row["name"] for row in csv.DictReader(handle) if row["name"])
+    return names
+
+
+def synthesize(names: list[str], size: int, seed: int = 7) -> list:
+    # Roughly 100 events per day with a share of re-listed or re-cased duplicates.
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    days = max(1, size // 100)
+    rows = []
+    for i in range(size):
+        name = rng.choice(names)
+        if rng.random() < 0.2:
+            name = name.upper() + "!"
+        elif rng.random() < 0.1:
+            name = name + " " + rng.choice(["2", "(Zürich)", "Party"])
+        event_date = (start + timedelta(days=rng.randrange(days))).isoformat()
+        rows.append(SimpleNamespace(date=event_date, name=name))
+    return rows
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 100000])
+    parser.add_argument("--threshold", type=float, nargs="+", default=[1, 0.9])
+    args = parser.parse_args()
+    names = load_names()
+    print(f"{'rows':>8} {'threshold':>9} {'indexed':>10} {'legacy':>10} {'kept':>7} match")
+    for size in args.sizes:
+        rows = synthesize(names, size)
+        for threshold in args.threshold:
+            indexed, indexed_time = timed(lambda r, t: list(unique_events(r, t)), rows, threshold)
+            legacy_col, match = "-", "-"
+            if size <= LEGACY_LIMIT:
+                legacy, legacy_time = timed(legacy_unique, rows, threshold)
+                legacy_col = f"{legacy_time:.3f}s"
+                match = "yes" if legacy == indexed else "NO"
+            print(
+                f"{size:>8} {threshold:>9} {indexed_time:>9.3f}s {legacy_col:>10} "
+                f"{len(indexed):>7} {match}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Check EventTextParser against the original BeautifulSoup get_text extraction and
+time both, over benchmarks/fixtures/latino/details/ plus generated edge-case pages
+(comments, CDATA, ruby annotations, templates, void and unclosed tags, self-closing
+and void-element scopes, texts over the limit). Exits with status 1 if any page's text differs.
+
+    python benchmarks/bench_detail_text.py [--repeat 5] [--pages 300]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from detail_text import DETAIL_TEXT_LIMIT, EVENT_ITEMTYPE, EventTextParser  # noqa: E402
+from normalize import clean_text  # noqa: E402
+
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures" / "latino" / "details"
+WORDS = "Salsa Bachata Kizomba kurs Zürich &amp; &nbsp; &lt;b&gt; café &#233; Tanz".split()
+HEAD = (
+    '<head><meta charset="utf-8"><title>T &amp; t</title>'
+    '<script>var x="<div itemtype=\\"' + EVENT_ITEMTYPE + '\\">no</div>";</script>'
+    "<style>p{a:b}</style><link rel=stylesheet href=x></head>"
+)
+# Snippets with {} slots for random text.
+SNIPPETS = (
+    "<p>{}</p>",
+    "<div>{}<br>{}</div>",
+    "<li>{}",
+    "<!-- {} -->",
+    "sal<!-- {} -->sa",
+    "<![CDATA[ {} ]]>",
+    "<?php {} ?>",
+    "<![if !IE]>{}<![endif]>",
+    "<ruby>{}<rp>(</rp><rt>{}</rt><rp>)</rp></ruby>",
+    "<span>{}</span>\n\n  ",
+    '<img src=x alt="{}">',
+    "<template><p>{}</p></template>",
+    "<template>{}<![CDATA[ {} ]]></template>",
+    "<b>{}<i>{}</b>{}",
+    "<div/>{}",
+    "\t{}  \n",
+)
+# Pages reported during review; they must keep matching.
+CASES = (
+    "<p>sal<!-- x -->sa</p>",
+    "<p>a<![CDATA[ zouk ]]>b</p>",
+    "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby> x",
+    "<!DOCTYPE html><p>a<?pi x?>b</p>",
+    f'<p>Salsa night<meta itemscope itemtype="{EVENT_ITEMTYPE}">bachata</p>',
+)
+
+
+def legacy_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    scope = soup.find(attrs={"itemtype": EVENT_ITEMTYPE}) or soup
+    return clean_text(scope.get_text(" "))[:DETAIL_TEXT_LIMIT]
+
+
+def current_text(html: str) -> str:
+    return EventTextParser().text(html)
+
+
+def generated_pages(count: int) -> list:
+    rng = random.Random(1)
+
+    def words(limit: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, limit)))
+
+    pages = []
+    for _ in range(count):
+        body = []
+        for _ in range(rng.randint(1, 60)):
+            snippet = rng.choice(SNIPPETS)
+            body.append(snippet.format(*[words(40) for _ in range(snippet.count("{}"))]))
+        inner = "".join(body)
+        scope = f'<div itemtype="{EVENT_ITEMTYPE}">'
+        layout = rng.random()
+        if layout < 0.4:
+            page = f"<html>{HEAD}<body><nav>menu</nav>{scope}{inner}</div><footer>{words(50)}</footer></body></html>"
+        elif layout < 0.6:
+            page = f"<html>{HEAD}<body>{inner}</body></html>"
+        elif layout < 0.65:
+            page = f'<html><body><div itemtype="{EVENT_ITEMTYPE}"/>{inner}</body></html>'
+        elif layout < 0.7:
+            page = f'<html><body><p>{words(20)}<meta itemscope itemtype="{EVENT_ITEMTYPE}">{inner}</p></body></html>'
+        elif layout < 0.85:
+            page = f"<html><body><section>{scope}<p>{inner * 5}</section>tail {words(20)}"
+        else:
+            page = f"<body>{scope}{inner}{scope}nested</div></div>"
+        pages.append(page)
+    return pages
+
+
+def best_time(func, pages, repeat: int) -> tuple:
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [func(html) for html in pages]
+        best = min(best, time.perf_counter() - started)
+    return results, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=300, help="generated edge-case pages")
+    args = parser.parse_args()
+    corpora = {
+        "fixtures": [path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.html"))],
+        "generated": list(CASES) + generated_pages(args.pages),
+    }
+    print(f"{'corpus':<10} {'pages':>6} {'legacy ms':>10} {'current ms':>10} {'differing':>9}")
+    mismatches = 0
+    for name, pages in corpora.items():
+        legacy, legacy_time = best_time(legacy_text, pages, args.repeat)
+        current, current_time = best_time(current_text, pages, args.repeat)
+        differing = [html for html, a, b in zip(pages, legacy, current) if a != b]
+        mismatches += len(differing)
+        print(
+            f"{name:<10} {len(pages):>6} {legacy_time * 1000:>10.2f} "
+            f"{current_time * 1000:>10.2f} {len(differing):>9}"
+        )
+        for html in differing[:3]:
+            print(f"  differs: {html[:120]!r}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
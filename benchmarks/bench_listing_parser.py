@@ -0,0 +1,151 @@
+"""
+Time crawl_events_latino_ch.parse_events per listing chunk against the original
+find_previous/re-parse implementation, using benchmarks/fixtures/latino/.
+
+    python benchmarks/bench_listing_parser.py [--repeat 10]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import crawl_events_latino_ch as latino  # noqa: E402
+
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures" / "latino"
+
+
+def legacy_address(event_div):
+    address = event_div.select_one(".address")
+    if not address:
+        return "", ""
+    host_el = address.find("div", class_="line")
+    city_el = address.find("b", class_="line")
+    return (
+        latino.clean_text(host_el.get_text()) if host_el else "",
+        latino.clean_text(city_el.get_text()) if city_el else "",
+    )
+
+
+def legacy_labels(event_div):
+    return latino.normalize_labels(
+        [
+            latino.clean_text(label.get_text())
+            for label in event_div.select(".label")
+            if latino.clean_text(label.get_text())
+        ]
+    )
+
+
+def legacy_block(event_div, event_date):
+    host, city = legacy_address(event_div)
+    time_el = event_div.select_one(".col-xs-5 span")
+    title_el = event_div.select_one(".title")
+    name = latino.clean_text(title_el.get_text() if title_el else "")
+    labels = latino.apply_name_rules(name, legacy_labels(event_div), host)
+    return [
+        latino.EventEntry(
+            date=event_date,
+            time=latino.clean_text(time_el.get_text() if time_el else ""),
+            name=name,
+            flyer=latino.extract_flyer(event_div),
+            url=latino.extract_url(event_div),
+            host=host,
+            city=city,
+            region=latino.determine_region(city),
+            source="latino.ch",
+            labels=labels,
+        )
+    ]
+
+
+def legacy_cluster(event_div, event_date):
+    host, city = legacy_address(event_div)
+    flyer = latino.extract_flyer(event_div)
+    url = latino.extract_url(event_div)
+    labels = legacy_labels(event_div)
+    region = latino.determine_region(city)
+    title_block = event_div.select_one(".title")
+    if not title_block:
+        return []
+    entries = []
+    for item in title_block.select("li"):
+        li_copy = BeautifulSoup(str(item), "html.parser")
+        span = li_copy.find("span")
+        time_text = ""
+        if span:
+            time_text = latino.clean_text(span.get_text())
+            span.extract()
+        name_text = latino.clean_text(li_copy.get_text())
+        if not name_text:
+            continue
+        entries.append(
+            latino.EventEntry(
+                date=event_date,
+                time=time_text,
+                name=name_text,
+                flyer=flyer,
+                url=url,
+                host=host,
+                city=city,
+                region=region,
+                source="latino.ch",
+                labels=latino.apply_name_rules(name_text, labels, host),
+            )
+        )
+    return entries
+
+
+def legacy_parse_events(html):
+    soup = BeautifulSoup(html, "html.parser")
+    chunk_events = []
+    for event_div in soup.select("div.event"):
+        header = event_div.find_previous("h3", attrs={"data-date": True})
+        if not header or not header.get("data-date"):
+            continue
+        event_date = header.get("data-date").strip()
+        if "cluster" in event_div.get("class", []):
+            chunk_events.extend(legacy_cluster(event_div, event_date))
+        else:
+            chunk_events.extend(legacy_block(event_div, event_date))
+    markers = [latino.clean_text(h.get("data-date")) for h in soup.select("h3[data-date]")]
+    return chunk_events, [marker for marker in markers if marker]
+
+
+def best_time(func, html, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(html)
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    print(f"parser backend: {latino.LISTING_PARSER}")
+    print(f"{'chunk':<16} {'KB':>6} {'events':>6} {'legacy ms':>10} {'current ms':>10} same")
+    totals = [0.0, 0.0]
+    for path in sorted(FIXTURES_DIR.glob("listing-*.html")):
+        html = path.read_text(encoding="utf-8")
+        legacy, legacy_time = best_time(legacy_parse_events, html, args.repeat)
+        current, current_time = best_time(latino.parse_events, html, args.repeat)
+        same = [e.to_row() for e in legacy[0]] == [e.to_row() for e in current[0]] and legacy[1] == current[1]
+        totals[0] += legacy_time
+        totals[1] += current_time
+        print(
+            f"{path.name:<16} {len(html) / 1024:>6.1f} {len(current[0]):>6} "
+            f"{legacy_time * 1000:>10.2f} {current_time * 1000:>10.2f} {'yes' if same else 'NO'}"
+        )
+    print(f"{'total':<30} {totals[0] * 1000:>10.2f} {totals[1] * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Replay the synthetic fixtures through both crawlers and time the whole crawl
+plus the hot functions at 1x, 10x and 100x the fixture volume. Results are
+saved per commit so runs on different commits can be compared. The fixtures
+are generated from the CSVs (see make_fixtures.py), so the numbers are only
+comparable with other runs on the same fixtures, not with crawls of the live sites.
+
+    python benchmarks/bench_pipeline.py [--scales 1 10 100] [--repeat 3]
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/<commit>.json
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+import replay  # puts scripts/ on sys.path
+from replay import FIXTURES_DIR, ROOT, bachata, latino
+
+import crawl_all_events
+from detail_cache import DetailCache
+from detail_text import extract_detail_text
+from event_entry import write_csv
+from instrumentation import METRICS
+from style_detection import detect_styles
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def git_revision() -> tuple[str, bool]:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=False
+        ).stdout.strip()
+
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(
+        git("status", "--porcelain", "--untracked-files=no")
+    )
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def crawl_once(workdir: Path, cache_path: Path) -> list:
+    """Both crawlers, merge and the combined CSV, as crawl_all_events.main runs them."""
+    METRICS.reset()
+    with replay.replaying(cache_path), redirect_stdout(io.StringIO()):
+        crawled = crawl_all_events.crawl_sources(
+            crawl_all_events.load_sources(), write_site_csv=False
+        )
+        combined = crawl_all_events.dedupe_and_sort(crawled)
+        write_csv(combined, workdir / "events.csv")
+    # The engine falls back to the stored CSVs on errors; that would time the wrong thing.
+    failed = [name for name in METRICS.counters if name.endswith(".failed")]
+    if failed:
+        raise SystemExit(f"Replay failed for {', '.join(failed)}; regenerate the fixtures")
+    return combined
+
+
+def scaled(items: list, scale: int, copy: Optional[Callable] = None) -> list:
+    if copy is None:
+        return items * scale
+    return [item if round_ == 0 else copy(item, round_) for round_ in range(scale) for item in items]
+
+
+def run(scales: list[int], repeat: int) -> list[dict]:
+    results = []
+
+    def record(benchmark: str, scale: int, items: int, seconds: float) -> None:
+        results.append(
+            {
+                "benchmark": benchmark,
+                "scale": scale,
+                "items": items,
+                "seconds": round(seconds, 6),
+                "items_per_second": round(items / seconds, 1) if seconds else None,
+            }
+        )
+        print(f"{benchmark:<24} {scale:>5}x {items:>8} {seconds * 1000:>11.2f} {items / seconds:>12.0f}")
+
+    print(f"{'benchmark':<24} {'scale':>6} {'items':>8} {'ms':>11} {'items/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        cache_path = workdir / "detail_cache.sqlite"
+        scaled_csv = workdir / "scaled.csv"
+        started = time.perf_counter()
+        combined = crawl_once(workdir, cache_path)
+        record("crawl.cold", 1, len(combined), time.perf_counter() - started)
+        record("crawl.warm", 1, len(combined), best_of(lambda: crawl_once(workdir, cache_path), repeat))
+
+        chunks = [
+            path.read_text(encoding="utf-8")
+            for path in sorted((FIXTURES_DIR / "latino").glob("listing-*.html"))
+        ]
+        chunk_events = sum(len(latino.parse_events(chunk)[0]) for chunk in chunks)
+        page = json.loads((FIXTURES_DIR / "bachata" / "page-01.json").read_text(encoding="utf-8"))
+        detail_pages = [
+            path.read_text(encoding="utf-8")
+            for path in sorted((FIXTURES_DIR / "latino" / "details").glob("*.html"))
+        ]
+        cache = DetailCache(cache_path)
+        style_inputs = [(event.name, event.labels, cache.text(event.url), event.host) for event in combined]
+        for scale in scales:
+            record(
+                "parse_events",
+                scale,
+                chunk_events * scale,
+                best_of(lambda: [latino.parse_events(chunk) for chunk in chunks * scale], repeat),
+            )
+            pages = scaled(detail_pages, scale)
+            record(
+                "extract_detail_text",
+                scale,
+                len(pages),
+                best_of(lambda: [extract_detail_text(html) for html in pages], repeat),
+            )
+            items = scaled(page["events"], scale)
+            record(
+                "build_event_entry",
+                scale,
+                len(items),
+                best_of(lambda: [bachata.build_event_entry(item) for item in items], repeat),
+            )
+            inputs = scaled(style_inputs, scale)
+            record(
+                "detect_styles",
+                scale,
+                len(inputs),
+                best_of(lambda: [detect_styles(*args) for args in inputs], repeat),
+            )
+            # Renamed copies so the larger volumes are not simply deduplicated away.
+            events = scaled(
+                combined, scale, lambda event, round_: event.replace(name=f"{event.name} {round_}")
+            )
+            record(
+                "dedupe_and_sort",
+                scale,
+                len(events),
+                best_of(lambda: crawl_all_events.dedupe_and_sort(events), repeat),
+            )
+            record(
+                "write_csv",
+                scale,
+                len(events),
+                # Remove the previous file so write_csv cannot skip an unchanged write.
+                best_of(
+                    lambda: (scaled_csv.unlink(missing_ok=True), write_csv(events, scaled_csv)),
+                    repeat,
+                ),
+            )
+    return results
+
+
+def compare(current: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    before = {(item["benchmark"], item["scale"]): item for item in baseline["results"]}
+    print(f"\n{baseline['commit']} -> {current['commit']} (ratio > 1 is faster)")
+    for item in current["results"]:
+        old = before.get((item["benchmark"], item["scale"]))
+        if old and item["seconds"]:
+            print(f"{item['benchmark']:<24} {item['scale']:>5}x {old['seconds'] / item['seconds']:>8.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    args = parser.parse_args()
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parser": latino.LISTING_PARSER,
+        "synthetic_fixtures": replay.load_manifest().get("synthetic", False),
+        "repeat": args.repeat,
+        "results": run(args.scales, args.repeat),
+    }
+    output = args.output or RESULTS_DIR / f"{commit}{'-dirty' if dirty else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+    print(f"Wrote {output}")
+    if report["synthetic_fixtures"]:
+        print("Fixtures are synthetic: compare these numbers with other commits, not with live crawls")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
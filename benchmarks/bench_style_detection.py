@@ -0,0 +1,107 @@
+"""
+Time detect_styles against the original per-call re.search implementation over
+the data/events.csv corpus. Detail texts come from data/detail_cache.sqlite when
+it exists, otherwise an 8 KB filler text mixed with other event names is used.
+
+    python benchmarks/bench_style_detection.py [--repeat 5]
+"""
+import argparse
+import csv
+import random
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from style_detection import (  # noqa: E402
+    STYLE_KEYWORDS,
+    StyleMatcher,
+    detect_styles,
+    normalize_styles,
+)
+
+FILLER = (
+    "Wir freuen uns auf einen Abend mit Workshop, Social Dance und DJ. "
+    "Eintritt an der Abendkasse, Getränke an der Bar, Garderobe vorhanden. "
+)
+
+
+def legacy_detect_styles(name, labels=None, detail_text=None, host=None):
+    haystack = " ".join([name or "", " ".join(labels or []), detail_text or "", host or ""])
+    folded = re.sub(r"\s+", " ", haystack).lower()
+    styles = []
+    for style_code, patterns in STYLE_KEYWORDS.items():
+        for pattern in patterns:
+            if re.search(pattern, folded):
+                styles.append(style_code)
+                break
+    return normalize_styles(styles)
+
+
+def load_corpus() -> list[tuple]:
+    with (ROOT / "data" / "events.csv").open(newline="", encoding="utf-8") as handle:
+        rows = [
+            {key.strip(): (value or "").strip() for key, value in row.items()}
+            for row in csv.DictReader(handle)
+        ]
+    cached: dict[str, str] = {}
+    cache_path = ROOT / "data" / "detail_cache.sqlite"
+    if cache_path.exists():
+        connection = sqlite3.connect(cache_path)
+        cached = dict(connection.execute("SELECT url, text FROM detail_pages"))
+        connection.close()
+    rng = random.Random(3)
+    names = [row["name"] for row in rows]
+    corpus = []
+    for row in rows:
+        detail = cached.get(row["url"])
+        if detail is None:
+            parts = []
+            while sum(len(part) for part in parts) < 8000:
+                parts.append(FILLER if rng.random() < 0.8 else rng.choice(names))
+            detail = " ".join(parts)[:8000]
+        labels = [label for label in row["labels"].split("|") if label]
+        corpus.append((row["name"], labels, detail, row["host"]))
+    return corpus
+
+
+def bench(func, corpus, repeat: int) -> tuple[list, float]:
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [func(*item) for item in corpus]
+        best = min(best, time.perf_counter() - started)
+    return results, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    corpus = load_corpus()
+    keywords_only = StyleMatcher(combinations=())
+
+    def keywords_detect(name, labels, detail, host):
+        return keywords_only.match(" ".join([name, " ".join(labels), detail, host]).lower())
+
+    legacy, legacy_time = bench(legacy_detect_styles, corpus, args.repeat)
+    compiled, compiled_time = bench(keywords_detect, corpus, args.repeat)
+    current, current_time = bench(detect_styles, corpus, args.repeat)
+    per_event = 1e6 / len(corpus)
+    print(f"{len(corpus)} events, best of {args.repeat}")
+    print(f"legacy re.search      {legacy_time * per_event:8.1f} us/event")
+    print(f"compiled keywords     {compiled_time * per_event:8.1f} us/event")
+    print(f"compiled + combos     {current_time * per_event:8.1f} us/event")
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    gained = sum(1 for a, b in zip(legacy, current) if a != b)
+    print(f"keyword results differing from legacy: {mismatches}")
+    print(f"events gaining codes from combination abbreviations: {gained}")
+
+
+if __name__ == "__main__":
+    main()
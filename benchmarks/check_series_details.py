@@ -0,0 +1,72 @@
+"""
+Check that series detail sharing stays limited to sources that opt in. A weekly
+bachata-bern.ch series whose occurrences have different inline descriptions is
+crawled through the engine; every occurrence must keep the styles of its own
+description and its own detail cache entry. Exits with status 1 otherwise.
+
+    python benchmarks/check_series_details.py
+"""
+import sys
+import tempfile
+from dataclasses import replace
+from datetime import date, timedelta
+from functools import partial
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import crawl_events_bachata_bern_ch as bachata  # noqa: E402
+import engine  # noqa: E402
+from detail_cache import DetailCache  # noqa: E402
+
+DESCRIPTIONS = {"Salsa night": ("S",), "Kizomba special": ("K",), "Bachata only": ("B",)}
+
+
+def series_items() -> list:
+    first = date.today() + timedelta(days=7)
+    items = []
+    for week, description in enumerate(DESCRIPTIONS):
+        day = (first + timedelta(weeks=week)).isoformat()
+        items.append(
+            {
+                "id": 1000 + week,
+                "title": "Latin Friday",
+                "start_date": f"{day} 21:00:00",
+                "url": f"{bachata.BASE_URL}/event/latin-friday/{day}/",
+                "description": description,
+                "venue": {"zip": "3011", "city": "Bern"},
+                "organizer": [{"organizer": "Dance Club"}],
+            }
+        )
+    return items
+
+
+def main() -> None:
+    items = series_items()
+    plugin = replace(bachata.PLUGIN, list_items=lambda context: items)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "detail_cache.sqlite"
+        original = engine.DetailCache
+        engine.DetailCache = partial(DetailCache, cache_path)
+        try:
+            [events] = engine.crawl([plugin], write_site_csv=False, fallback=False)
+        finally:
+            engine.DetailCache = original
+        cache = DetailCache(cache_path)
+        for item, event in zip(items, events):
+            expected = DESCRIPTIONS[item["description"]]
+            if event.style != expected:
+                failures.append(f"{event.date}: style {event.style}, expected {expected}")
+            if cache.text(event.url) != item["description"]:
+                failures.append(f"{event.date}: cached {cache.text(event.url)!r}, expected {item['description']!r}")
+    for failure in failures:
+        print(failure)
+    print(f"{len(events)} occurrences, {len(failures)} failures")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Regenerate the offline fixtures in benchmarks/fixtures/ from the committed CSVs.
+The fixtures are synthetic, not recordings of the live sites. The markup only
+holds what the crawlers select on, so the fixtures round-trip through the parsers
+without network access. The format=js listing chunks are plain HTML fragments,
+detail pages carry a short filler text, and API items only have the fields the
+crawler reads. Timings on them compare commits with each other; they are not
+throughput figures for real pages. manifest.json maps the requests the crawlers
+send to the fixture files (see benchmarks/replay.py).
+
+    python benchmarks/make_fixtures.py
+"""
+import csv
+import hashlib
+import html
+import json
+from itertools import groupby
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures"
+LATINO_DIR = FIXTURES_DIR / "latino"
+LATINO_DETAILS_DIR = LATINO_DIR / "details"
+BACHATA_DIR = FIXTURES_DIR / "bachata"
+MANIFEST_PATH = FIXTURES_DIR / "manifest.json"
+DATES_PER_CHUNK = 7
+BACHATA_PER_PAGE = 100
+DETAIL_FILLER = (
+    "Wir freuen uns auf einen Abend mit Workshop, Social Dance und DJ. "
+    "Eintritt an der Abendkasse, Getränke an der Bar, Garderobe vorhanden."
+)
+
+
+def read_rows(path: Path) -> list[dict]:
+    with path.open(newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def render_block(rows: list[dict]) -> str:
+    first = rows[0]
+    href = html.escape(first["url"].replace("https://www.latino.ch", ""))
+    flyer = f'<img src="{html.escape(first["flyer"])}" alt="">' if first["flyer"] else ""
+    labels = "".join(
+        f'<span class="label label-default">{html.escape(label)}</span>'
+        for label in first["labels"].split("|")
+        if label
+    )
+    address = (
+        '<div class="address">'
+        f'<div class="line">{html.escape(first["host"])}</div>'
+        f'<b class="line">{html.escape(first["city"])}</b>'
+        "</div>"
+    )
+    if len(rows) > 1:
+        items = "".join(
+            f'<li><span class="time">{html.escape(row["time"])}</span> {html.escape(row["name"])}</li>'
+            for row in rows
+        )
+        return (
+            f'<a href="{href}"><div class="event cluster row">'
+            f'<div class="col-xs-3">{flyer}</div>'
+            f'<div class="col-xs-9"><div class="title"><ul>{items}</ul></div>{address}{labels}</div>'
+            "</div></a>\n"
+        )
+    return (
+        f'<a href="{href}"><div class="event row">'
+        f'<div class="col-xs-2">{flyer}</div>'
+        f'<div class="col-xs-5"><span>{html.escape(first["time"])}</span></div>'
+        f'<div class="col-xs-5"><div class="title">{html.escape(first["name"])}</div>'
+        f"{address}{labels}</div>"
+        "</div></a>\n"
+    )
+
+
+def render_day(event_date: str, rows: list[dict]) -> str:
+    parts = [f'<h3 class="date" data-date="{event_date}">{event_date}</h3>\n']
+    # Venue pages list several events of one evening; render those as clusters.
+    for _, group in groupby(rows, key=lambda row: row["url"] if "/venues/" in row["url"] else id(row)):
+        parts.append(render_block(list(group)))
+    return "".join(parts)
+
+
+def write_latino_listing(rows: list[dict]) -> tuple[list[Path], dict[str, str]]:
+    """Write the listing chunks; returns them and the scroll cursor that requests each follow-up chunk."""
+    LATINO_DIR.mkdir(parents=True, exist_ok=True)
+    days = [(day, list(group)) for day, group in groupby(rows, key=lambda row: row["date"])]
+    written = []
+    cursors = {}
+    for index in range(0, len(days), DATES_PER_CHUNK):
+        if index:
+            cursors[days[index - 1][0]] = f"latino/listing-{index // DATES_PER_CHUNK + 1:02d}.html"
+        body = "".join(render_day(day, group) for day, group in days[index : index + DATES_PER_CHUNK])
+        if index == 0:
+            body = (
+                "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Events</title></head>"
+                f'<body><nav><h3>Menu</h3></nav><div id="events">\n{body}</div></body></html>\n'
+            )
+        path = LATINO_DIR / f"listing-{index // DATES_PER_CHUNK + 1:02d}.html"
+        path.write_text(body, encoding="utf-8")
+        written.append(path)
+    return written, cursors
+
+
+def render_detail(rows: list[dict]) -> str:
+    first = rows[0]
+    program = "".join(
+        f"<li>{html.escape(row['time'])} {html.escape(row['name'])}</li>" for row in rows
+    )
+    labels = ", ".join(label for label in first["labels"].split("|") if label)
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(first['name'])}</title></head><body>"
+        '<nav><a href="/events">Events</a> <a href="/venues">Venues</a> <a href="/courses">Kurse</a></nav>'
+        '<div itemscope itemtype="http://schema.org/Event">'
+        f'<h1 itemprop="name">{html.escape(first["name"])}</h1>'
+        f'<div itemprop="location">{html.escape(first["host"])}, {html.escape(first["city"])}</div>'
+        f"<ul>{program}</ul>"
+        f"<p>{html.escape(labels)}</p><p>{DETAIL_FILLER}</p>"
+        "</div><footer>latino.ch</footer></body></html>\n"
+    )
+
+
+def write_latino_details(rows: list[dict]) -> dict[str, str]:
+    LATINO_DETAILS_DIR.mkdir(parents=True, exist_ok=True)
+    by_url: dict[str, list[dict]] = {}
+    for row in rows:
+        if row["url"]:
+            by_url.setdefault(row["url"], []).append(row)
+    details = {}
+    for url, url_rows in by_url.items():
+        name = f"latino/details/{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}.html"
+        (FIXTURES_DIR / name).write_text(render_detail(url_rows), encoding="utf-8")
+        details[url] = name
+    return details
+
+
+def bachata_item(event_id: int, row: dict) -> dict:
+    zip_code, _, city = row["city"].partition(" ")
+    labels = [label for label in row["labels"].split("|") if label]
+    return {
+        "id": event_id,
+        "title": row["name"],
+        "description": (
+            f"<p>{html.escape(row['name'])} in {html.escape(row['host'])}.</p>"
+            f"<p>{DETAIL_FILLER}</p>"
+        ),
+        "start_date": f"{row['date']} {row['time'] or '00:00'}:00",
+        "url": row["url"],
+        "image": {"url": row["flyer"]} if row["flyer"] else False,
+        "venue": {"venue": row["host"], "zip": zip_code, "city": city},
+        "organizer": [{"organizer": row["host"]}],
+        "categories": [{"name": label.title()} for label in labels],
+        "tags": [],
+    }
+
+
+def write_bachata_api(rows: list[dict]) -> int:
+    BACHATA_DIR.mkdir(parents=True, exist_ok=True)
+    items = [bachata_item(1000 + index, row) for index, row in enumerate(rows)]
+    total_pages = max(1, -(-len(items) // BACHATA_PER_PAGE))
+    for page in range(1, total_pages + 1):
+        chunk = items[(page - 1) * BACHATA_PER_PAGE : page * BACHATA_PER_PAGE]
+        payload = {"events": chunk, "total": len(items), "total_pages": total_pages}
+        (BACHATA_DIR / f"page-{page:02d}.json").write_text(
+            json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8"
+        )
+    return total_pages
+
+
+def main() -> None:
+    rows = read_rows(ROOT / "data" / "events_latino_ch.csv")
+    rows.sort(key=lambda row: row["date"])
+    written, cursors = write_latino_listing(rows)
+    details = write_latino_details(rows)
+    print(f"Wrote {len(written)} latino.ch listing chunks and {len(details)} detail pages to {LATINO_DIR}")
+    bachata_rows = read_rows(ROOT / "data" / "events-bachata-bern.csv")
+    bachata_rows.sort(key=lambda row: (row["date"], row["time"]))
+    total_pages = write_bachata_api(bachata_rows)
+    print(f"Wrote {total_pages} bachata-bern.ch API pages for {len(bachata_rows)} events to {BACHATA_DIR}")
+    manifest = {
+        "synthetic": True,
+        # The crawlers only look ahead from "today", so replays pin it to the first listed day.
+        "today": min(rows[0]["date"], bachata_rows[0]["date"]),
+        "latino_cursors": cursors,
+        "latino_details": details,
+        "bachata_pages": total_pages,
+    }
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    print(f"Wrote {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
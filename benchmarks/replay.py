@@ -0,0 +1,148 @@
+"""
+Serve the synthetic fixtures in benchmarks/fixtures/ to the crawlers through a
+requests transport adapter, so whole crawls run without network access.
+Regenerate the fixtures with benchmarks/make_fixtures.py.
+"""
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date
+from functools import partial
+from pathlib import Path
+from types import ModuleType
+from typing import Iterator, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import requests  # noqa: E402
+from requests.adapters import BaseAdapter  # noqa: E402
+from requests.structures import CaseInsensitiveDict  # noqa: E402
+
+import crawl_events_bachata_bern_ch as bachata  # noqa: E402
+import crawl_events_latino_ch as latino  # noqa: E402
+import detail_cache  # noqa: E402
+import engine  # noqa: E402
+import incremental  # noqa: E402
+from detail_cache import DetailCache  # noqa: E402
+from http_client import build_session  # noqa: E402
+from throttle import HostRateLimiter  # noqa: E402
+
+FIXTURES_DIR = ROOT / "benchmarks" / "fixtures"
+MANIFEST_PATH = FIXTURES_DIR / "manifest.json"
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict:
+    with path.open(encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers latino.ch listing/detail and bachata-bern.ch API requests from fixture files."""
+
+    def __init__(self, manifest: dict, fixtures_dir: Path = FIXTURES_DIR) -> None:
+        super().__init__()
+        self.manifest = manifest
+        self.fixtures_dir = fixtures_dir
+        self.bodies: dict[str, bytes] = {}
+        self.requests = 0
+
+    def read(self, name: str) -> bytes:
+        # Keep the files in memory so repeated runs measure the crawler, not the disk.
+        if name not in self.bodies:
+            self.bodies[name] = (self.fixtures_dir / name).read_bytes()
+        return self.bodies[name]
+
+    def route(self, url: str) -> tuple[int, str, bytes]:
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        if parts.netloc == urlsplit(latino.BASE_URL).netloc:
+            if parts.path == latino.LISTING_PATH:
+                cursor = query.get("filter[last_date]", [None])[0]
+                if cursor is None:
+                    return 200, "text/html", self.read("latino/listing-01.html")
+                name = self.manifest["latino_cursors"].get(cursor)
+                # Past the last chunk the real site answers with an empty page.
+                return 200, "text/javascript", self.read(name) if name else b""
+            name = self.manifest["latino_details"].get(f"{latino.BASE_URL}{parts.path}")
+            if name:
+                return 200, "text/html", self.read(name)
+        if parts.netloc == urlsplit(bachata.BASE_URL).netloc and parts.path.startswith(bachata.API_PATH):
+            page = int(query.get("page", ["1"])[0])
+            if page <= self.manifest["bachata_pages"]:
+                return 200, "application/json", self.read(f"bachata/page-{page:02d}.json")
+        return 404, "text/plain", b"no fixture"
+
+    def send(self, request, **kwargs) -> requests.Response:
+        self.requests += 1
+        status, content_type, body = self.route(request.url)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": f"{content_type}; charset=utf-8", "Content-Length": str(len(body))}
+        )
+        response.encoding = "utf-8"
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status == 200 else "Not Found"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def replay_session(adapter: ReplayAdapter) -> requests.Session:
+    session = build_session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def frozen_date(day: date) -> type:
+    class FrozenDate(date):
+        @classmethod
+        def today(cls) -> date:
+            return day
+
+    return FrozenDate
+
+
+CRAWLER_MODULES = (engine, latino, bachata)
+# Modules that only need the frozen date.
+DATED_MODULES = (detail_cache, incremental)
+
+
+@contextmanager
+def replaying(
+    cache_path: Path,
+    manifest: dict = None,
+    modules: Sequence[ModuleType] = CRAWLER_MODULES,
+) -> Iterator[ReplayAdapter]:
+    """
+    Point the crawler modules at the fixtures: sessions use the replay adapter,
+    "today" is the first listed day, detail pages go to cache_path instead of
+    data/detail_cache.sqlite and the per-host throttle is off.
+    """
+    manifest = manifest or load_manifest()
+    adapter = ReplayAdapter(manifest)
+    today = frozen_date(date.fromisoformat(manifest["today"]))
+    patches = {
+        "build_session": lambda: replay_session(adapter),
+        "date": today,
+        "DetailCache": partial(DetailCache, cache_path),
+        "HostRateLimiter": lambda requests_per_second: HostRateLimiter(0),
+    }
+    targets = [(module, name, value) for module in modules for name, value in patches.items()]
+    targets += [(module, "date", today) for module in DATED_MODULES]
+    saved = []
+    for module, name, value in targets:
+        if hasattr(module, name):
+            saved.append((module, name, getattr(module, name)))
+            setattr(module, name, value)
+    try:
+        yield adapter
+    finally:
+        for module, name, value in reversed(saved):
+            setattr(module, name, value)
@@ -0,0 +1,163 @@
+import gzip
+import io
+import json
+from datetime import date, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from event_entry import EventEntry, labels_cell, style_cell
+from output_files import content_hash
+
+COMPACT_VERSION = 1
+SHARD_PATTERN = "events-*.json.gz"
+SHARD_MANIFEST = "manifest.json"
+# Columns with few distinct values are stored once in a dictionary and referenced by index.
+DICTIONARY_COLUMNS = ("time", "host", "city", "region", "source", "style", "labels")
+
+
+def column_values(events: Sequence[EventEntry], column: str) -> List[str]:
+    if column == "style":
+        return [style_cell(event.style) for event in events]
+    if column == "labels":
+        return [labels_cell(event.labels) for event in events]
+    return [getattr(event, column) for event in events]
+
+
+def ordered_events(events: Iterable[EventEntry]) -> List[EventEntry]:
+    """Row order shared by the compact file and the filter index; row ids index into it."""
+    # Stable sort: the caller's time/name order within a day is kept.
+    return sorted((event for event in events if event.date), key=lambda event: event.date)
+
+
+def day_offsets(events: Sequence[EventEntry]) -> Tuple[int, List[int]]:
+    days = [date.fromisoformat(event.date).toordinal() for event in events]
+    base = min(days) if days else date.today().toordinal()
+    return base, [day - base for day in days]
+
+
+def day_ranges(offsets: Sequence[int]) -> List[List[int]]:
+    """[offset, first row, row count] per date of the date-sorted rows."""
+    groups: List[List[int]] = []
+    for row, offset in enumerate(offsets):
+        if groups and groups[-1][0] == offset:
+            groups[-1][2] += 1
+        else:
+            groups.append([offset, row, 1])
+    return groups
+
+
+def build_compact(events: Iterable[EventEntry]) -> dict:
+    """
+    Columnar form of the merged events for the frontend. Events keep their
+    sorted order; dates are day offsets from base_date and days lists
+    [offset, first row, row count] per date so a day view needs no grouping.
+    """
+    events = ordered_events(events)
+    base, offsets = day_offsets(events)
+    dictionaries = {}
+    columns = {"day": offsets}
+    for column in DICTIONARY_COLUMNS:
+        values = column_values(events, column)
+        dictionary = sorted(set(values))
+        index = {value: position for position, value in enumerate(dictionary)}
+        dictionaries[column] = dictionary
+        columns[column] = [index[value] for value in values]
+    for column in ("name", "flyer", "url"):
+        columns[column] = column_values(events, column)
+    return {
+        "version": COMPACT_VERSION,
+        "base_date": date.fromordinal(base).isoformat(),
+        "count": len(events),
+        "dictionaries": dictionaries,
+        "columns": columns,
+        "days": day_ranges(offsets),
+    }
+
+
+def build_filter_index(events: Iterable[EventEntry]) -> dict:
+    """
+    Sorted row ids per region, label, label combination and style code, plus
+    the per-date row ranges, over the same rows as build_compact. Filters
+    become intersections of these lists and a date bound becomes a row bound.
+    """
+    events = ordered_events(events)
+    base, offsets = day_offsets(events)
+    index: dict[str, dict[str, List[int]]] = {"region": {}, "label": {}, "label_set": {}, "style": {}}
+    for row, event in enumerate(events):
+        if event.region:
+            index["region"].setdefault(event.region, []).append(row)
+        for label in set(event.labels):
+            index["label"].setdefault(label, []).append(row)
+        index["label_set"].setdefault(labels_cell(event.labels), []).append(row)
+        for style in set(event.style):
+            index["style"].setdefault(style, []).append(row)
+    return {
+        "version": COMPACT_VERSION,
+        "base_date": date.fromordinal(base).isoformat(),
+        "count": len(events),
+        "days": day_ranges(offsets),
+        **{name: dict(sorted(ids.items())) for name, ids in index.items()},
+    }
+
+
+def render_compact(events: Iterable[EventEntry]) -> bytes:
+    payload = json.dumps(build_compact(events), ensure_ascii=False, separators=(",", ":"))
+    buffer = io.BytesIO()
+    # mtime=0 and no file name keep the bytes identical for identical data.
+    with gzip.GzipFile(filename="", mode="wb", fileobj=buffer, compresslevel=9, mtime=0) as handle:
+        handle.write(payload.encode("utf-8"))
+    return buffer.getvalue()
+
+
+def render_filter_index(events: Iterable[EventEntry]) -> bytes:
+    return json.dumps(build_filter_index(events), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def week_start(event: EventEntry) -> date:
+    day = date.fromisoformat(event.date)
+    return day - timedelta(days=day.weekday())
+
+
+def render_shards(events: Iterable[EventEntry]) -> Dict[str, bytes]:
+    """
+    Split the events into one compact file per week (Monday to Sunday) plus
+    manifest.json with each shard's range, size and SHA-256. The hash is part
+    of the file name, so an unchanged week keeps its URL and stays cached.
+    Returns file name -> content.
+    """
+    files: Dict[str, bytes] = {}
+    shards = []
+    for monday, week in groupby(ordered_events(events), key=week_start):
+        week = list(week)
+        content = render_compact(week)
+        digest = content_hash(content)
+        year, number, _ = monday.isocalendar()
+        name = f"events-{year}-W{number:02d}-{digest[:12]}.json.gz"
+        files[name] = content
+        shards.append(
+            {
+                "file": name,
+                "start": monday.isoformat(),
+                "end": (monday + timedelta(days=6)).isoformat(),
+                "count": len(week),
+                "bytes": len(content),
+                "sha256": digest,
+            }
+        )
+    manifest = {
+        "version": COMPACT_VERSION,
+        "count": sum(shard["count"] for shard in shards),
+        "shards": shards,
+    }
+    files[SHARD_MANIFEST] = (json.dumps(manifest, ensure_ascii=False, indent=1) + "\n").encode("utf-8")
+    return files
+
+
+def prune_shards(directory: Path, current: Iterable[str]) -> List[Path]:
+    """Delete shard files of weeks that changed or passed."""
+    keep = set(current)
+    stale = [path for path in directory.glob(SHARD_PATTERN) if path.name not in keep]
+    for path in stale:
+        path.unlink()
+    return stale
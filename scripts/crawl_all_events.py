@@ -1,100 +1,155 @@
-import csv
-import re
-import shutil
-from difflib import SequenceMatcher
-from pathlib import Path
-
-from crawl_events_bachata_bern_ch import main as crawl_bachata
-from crawl_events_latino_ch import main as crawl_latino
+import importlib
+import json
+from itertools import chain
+from typing import Iterable, List, Sequence
+
 from crawl_settings import (
+    ALL_EVENTS_PATH,
     DATA_DIR,
-    FIELDNAMES,
     PUBLIC_DIR,
+    build_arg_parser,
     enable_http_logging,
 )
+from compact_export import (
+    SHARD_MANIFEST,
+    prune_shards,
+    render_compact,
+    render_filter_index,
+    render_shards,
+)
+from dedupe import unique_events
+from engine import SourcePlugin, crawl, registered_sources
+from event_entry import render_events
+from event_store import EventStore
+from instrumentation import METRICS, count, timer
+from output_files import content_hash, write_if_changed
+from series import render_series
 
-ALL_EVENTS_PATH = DATA_DIR / "events.csv"
 PUBLIC_ALL_EVENTS_PATH = PUBLIC_DIR / "events.csv"
+PUBLIC_COMPACT_PATH = PUBLIC_DIR / "events.json.gz"
+PUBLIC_INDEX_PATH = PUBLIC_DIR / "events.index.json"
+PUBLIC_SHARDS_DIR = PUBLIC_DIR / "shards"
+PUBLIC_META_PATH = PUBLIC_DIR / "events.meta.json"
+PUBLIC_SERIES_PATH = PUBLIC_DIR / "events.series.json"
+RUN_REPORT_PATH = DATA_DIR / "run_report.json"
+
+
+# Crawler modules register their source when imported. Merge order follows
+# the plugin priority: when two sources list the same event, the earlier one wins.
+SOURCE_MODULES = (
+    "crawl_events_latino_ch",
+    "crawl_events_bachata_bern_ch",
+)
 
 
-def read_events(path: Path) -> list[dict]:
-    if not path.exists():
-        return []
-    with path.open("r", newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        rows = []
-        for row in reader:
-            row.setdefault("source", "")
-            row.setdefault("style", "")
-            rows.append(row)
-        return rows
-
-
-def normalize_name(name: str) -> str:
-    # Lowercase and strip punctuation/extra whitespace for fuzzy comparison.
-    cleaned = re.sub(r"[^a-z0-9]+", " ", name.lower())
-    return cleaned.strip()
-
-
-def names_similar(a: str, b: str, threshold: float = 1) -> bool:
-    if not a or not b:
-        return False
-    if normalize_name(a) == normalize_name(b):
-        return True
-    return SequenceMatcher(None, normalize_name(a), normalize_name(b)).ratio() >= threshold
-
-
-def dedupe_and_sort(rows: list[dict]) -> list[dict]:
-    unique: list[dict] = []
-    for row in rows:
-        date = row.get("date", "")
-        name = row.get("name", "")
-        if not date or not name:
-            continue
-        is_duplicate = False
-        for existing in unique:
-            if existing.get("date", "") != date:
-                continue
-            if names_similar(existing.get("name", ""), name):
-                is_duplicate = True
-                break
-        if not is_duplicate:
-            unique.append(row)
+def load_sources(modules: Sequence[str] = SOURCE_MODULES) -> List[SourcePlugin]:
+    for module in modules:
+        importlib.import_module(module)
+    return registered_sources()
+
+
+def dedupe_and_sort(events: Iterable, threshold: float = 1) -> list:
+    unique = list(unique_events(events, threshold))
     unique.sort(
         key=lambda item: (
-            item.get("date", ""),
-            item.get("time", ""),
-            (item.get("name") or "").lower(),
+            item.date,
+            item.time,
+            (item.name or "").lower(),
         )
     )
     return unique
 
 
-def write_all_events(rows: list[dict]) -> None:
-    ALL_EVENTS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with ALL_EVENTS_PATH.open("w", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(handle, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-    PUBLIC_ALL_EVENTS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy(ALL_EVENTS_PATH, PUBLIC_ALL_EVENTS_PATH)
-
-
-def main() -> None:
+def build_meta(published: dict) -> dict:
+    """Hashes of the published files and one hash over all of them, for cache busting."""
+    files = {
+        path.relative_to(PUBLIC_DIR).as_posix(): content_hash(content)
+        for path, content in sorted(published.items())
+    }
+    combined = content_hash("".join(f"{name}:{digest}\n" for name, digest in files.items()).encode("utf-8"))
+    return {"version": 1, "hash": combined, "files": files}
+
+
+def write_all_events(events: Sequence, series: bool = False) -> int:
+    """
+    Render every output in memory and only replace the files whose content
+    changed. Returns the number of files written.
+    """
+    csv_content = render_events(events).encode("utf-8")
+    shards = render_shards(events)
+    published = {
+        PUBLIC_ALL_EVENTS_PATH: csv_content,
+        # Smaller download for the frontend; events.csv stays for everything else.
+        PUBLIC_COMPACT_PATH: render_compact(events),
+        PUBLIC_INDEX_PATH: render_filter_index(events),
+        # Weekly slices so the frontend can show the current week before the rest arrives.
+        PUBLIC_SHARDS_DIR / SHARD_MANIFEST: shards.pop(SHARD_MANIFEST),
+    }
+    if series:
+        # Recurring events written once with their dates.
+        published[PUBLIC_SERIES_PATH] = render_series(events)
+    outputs = {ALL_EVENTS_PATH: csv_content, **published}
+    outputs.update({PUBLIC_SHARDS_DIR / name: content for name, content in shards.items()})
+    # The shard manifest already lists every shard's hash.
+    meta = json.dumps(build_meta(published), indent=1) + "\n"
+    outputs[PUBLIC_META_PATH] = meta.encode("utf-8")
+    written = sum(write_if_changed(path, content) for path, content in outputs.items())
+    prune_shards(PUBLIC_SHARDS_DIR, shards)
+    if not series:
+        # A series file from an earlier --series run would be published stale.
+        PUBLIC_SERIES_PATH.unlink(missing_ok=True)
+    return written
+
+
+def crawl_sources(
+    sources: Sequence[SourcePlugin], incremental: bool = False, write_site_csv: bool = True
+) -> List:
+    """All sources on one engine run, flattened in source order."""
+    return list(chain.from_iterable(crawl(sources, incremental, write_site_csv)))
+
+
+def main(incremental: bool = False, write_site_csv: bool = True, series: bool = False) -> None:
     enable_http_logging()
-    crawl_latino()
-    crawl_bachata()
-    latino_rows = read_events(DATA_DIR / "events_latino_ch.csv")
-    bachata_rows = read_events(DATA_DIR / "events-bachata-bern.csv")
-    combined = dedupe_and_sort(latino_rows + bachata_rows)
-    if not combined:
-        raise SystemExit("No events found to combine")
-    write_all_events(combined)
-    print(
-        f"Wrote {len(combined)} combined events to {ALL_EVENTS_PATH} and {PUBLIC_ALL_EVENTS_PATH}"
-    )
+    METRICS.reset()
+    try:
+        with timer("crawl"):
+            crawled = crawl_sources(load_sources(), incremental, write_site_csv)
+        with timer("merge.dedupe"):
+            combined = dedupe_and_sort(crawled)
+        count("merge.events_in", len(crawled))
+        count("merge.events_out", len(combined))
+        if not combined:
+            raise SystemExit("No events found to combine")
+        store = EventStore()
+        with timer("merge.store"):
+            run = store.record_run(combined)
+            # The published files are a view of the store rather than of this run's lists.
+            published = store.current_events()
+        print(run.summary())
+        with timer("merge.write"):
+            written = write_all_events(published, series)
+        count("merge.files_written", written)
+        print(
+            f"Merged {len(combined)} events into {ALL_EVENTS_PATH} and {PUBLIC_DIR}/ "
+            f"({written} files changed)"
+        )
+    finally:
+        METRICS.write_report(RUN_REPORT_PATH)
+        print(f"Wrote run report to {RUN_REPORT_PATH}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = build_arg_parser("Crawl all sources and merge their events.")
+    parser.add_argument(
+        "--no-site-csv",
+        dest="write_site_csv",
+        action="store_false",
+        help="skip writing the per-site CSV files (incremental mode reads them as its baseline)",
+    )
+    parser.add_argument(
+        "--series",
+        action="store_true",
+        help=f"also write {PUBLIC_SERIES_PATH} with recurring events collapsed into one entry each",
+    )
+    args = parser.parse_args()
+    main(incremental=args.incremental, write_site_csv=args.write_site_csv, series=args.series)
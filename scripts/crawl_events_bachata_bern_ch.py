@@ -1,169 +1,63 @@
-import csv
-import re
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import Iterable, List, Optional, Sequence
 from urllib.parse import urljoin
 
 from crawl_settings import (
+    CrawlError,
     DATA_DIR,
     DEFAULT_HEADERS,
-    build_headers,
-    FIELDNAMES,
     enable_http_logging,
+    parse_crawl_args,
     TARGET_DAY_SPAN,
 )
-from style_detection import detect_styles, styles_to_cell
+from engine import CrawlContext, SourcePlugin, crawl, register
+from event_entry import EventEntry
+from normalize import clean_text, normalize_labels
+from regions import determine_region
+from style_detection import detect_styles
 import requests
 
-LABEL_REPLACEMENTS = {
-    "social dance": "party",
-    "bachata party schweiz": "party",
-}
-
-
-def normalize_labels(raw_labels: Iterable[str]) -> List[str]:
-    normalized: List[str] = []
-    for label in raw_labels:
-        value = label.lower().strip()
-        value = LABEL_REPLACEMENTS.get(value, value)
-        if value and value not in normalized:
-            normalized.append(value)
-    return normalized
-
 BASE_URL = "https://bachata-bern.ch"
 API_PATH = "/wp-json/tribe/events/v1/events/"
 OUTPUT_PATH = DATA_DIR / "events-bachata-bern.csv"
 HEADERS = DEFAULT_HEADERS
+PAGE_FETCH_WORKERS = 4
 
 
-@dataclass
-class EventEntry:
-    date: str
-    time: str
-    name: str
-    flyer: str
-    url: str
-    host: str
-    city: str
-    region: str
-    source: str
-    labels: Sequence[str]
-    style: Sequence[str] = ()
-
-    def to_row(self) -> dict:
-        return {
-            "date": self.date,
-            "time": self.time,
-            "name": self.name,
-            "flyer": self.flyer,
-            "url": self.url,
-            "host": self.host,
-            "city": self.city,
-            "region": self.region,
-            "source": self.source,
-            "style": styles_to_cell(self.style),
-            "labels": "|".join(sorted(set(self.labels))),
-        }
-
-
-def clean_text(value: Optional[str]) -> str:
-    if not value:
-        return ""
-    return re.sub(r"\s+", " ", value).strip()
-
-
-def determine_region(city_text: str) -> str:
-    if not city_text:
-        return "Region Zürich"
-    lc = city_text.lower()
-    city_based = {
-        "bern": "Region Bern",
-        "thun": "Region Bern",
-        "biel": "Region Bern",
-        "fribourg": "Region Bern",
-        "fribourg/fribourg": "Region Bern",
-        "fribourg/friburg": "Region Bern",
-        "friburg": "Region Bern",
-        "düdingen": "Region Bern",
-        "zürich": "Region Zürich",
-        "zuerich": "Region Zürich",
-        "zurich": "Region Zürich",
-        "winterthur": "Region Zürich",
-        "schaffhausen": "Ost Schweiz",
-        "luzern": "Zentral Schweiz",
-        "kriens": "Zentral Schweiz",
-        "rotkreuz": "Zentral Schweiz",
-        "zug": "Zentral Schweiz",
-        "solothurn": "Region Solothurn & Aarau",
-        "aarau": "Region Solothurn & Aarau",
-        "wohlen": "Region Solothurn & Aarau",
-        "olten": "Region Solothurn & Aarau",
-        "st. gallen": "Ost Schweiz",
-        "st gallen": "Ost Schweiz",
-        "st.gallen": "Ost Schweiz",
-        "chur": "Ost Schweiz",
-        "konstanz": "Ost Schweiz",
-        "rapperswil-jona": "Ost Schweiz",
-        "lausanne": "West Schweiz",
-        "geneva": "West Schweiz",
-        "genève": "West Schweiz",
-        "neuchâtel": "West Schweiz",
-        "neuchatel": "West Schweiz",
-        "sion": "Wallis",
-        "martigny": "Wallis",
-        "brig": "Wallis",
-        "lugano": "Tessin",
-        "locarno": "Tessin",
-        "basel": "Region Basel",
-    }
-    for needle, region in city_based.items():
-        if needle in lc:
-            return region
-    match = re.search(r"(\d{4})", city_text)
-    if match:
-        plz = int(match.group(1))
-        if 1000 <= plz < 1700 or 2000 <= plz < 3000:
-            return "West Schweiz"
-        if 1700 <= plz < 1800 or 3000 <= plz < 3900:
-            return "Region Bern"
-        if 1800 <= plz < 2000 or 3900 <= plz < 4000:
-            return "Wallis"
-        if 4000 <= plz < 4500:
-            return "Region Basel"
-        if 4500 <= plz < 6000:
-            return "Region Solothurn & Aarau"
-        if 6000 <= plz < 6500:
-            return "Zentral Schweiz"
-        if 6500 <= plz < 7000:
-            return "Tessin"
-        if 7000 <= plz < 8000 or 8200 <= plz:
-            return "Ost Schweiz"
-    return "Region Zürich"
+def fetch_page(session: requests.Session, params: dict, page: int) -> dict:
+    response = session.get(
+        urljoin(BASE_URL, API_PATH),
+        params={**params, "page": page},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()
 
 
-def fetch_events(session: requests.Session) -> List[dict]:
+def fetch_events(session: requests.Session, workers: int = PAGE_FETCH_WORKERS) -> List[dict]:
+    """
+    Fetch page 1 to learn total_pages, then the remaining pages concurrently.
+    Events are returned in page order.
+    """
     today = date.today()
     end_date = today + timedelta(days=TARGET_DAY_SPAN)
     params = {
-        "page": 1,
         "per_page": 100,
         "start_date": f"{today.isoformat()} 00:00:00",
         "end_date": f"{end_date.isoformat()} 23:59:59",
         "status": "publish",
     }
-    events: List[dict] = []
-    while True:
-        response = session.get(
-            urljoin(BASE_URL, API_PATH), params=params, headers=build_headers(), timeout=30
-        )
-        response.raise_for_status()
-        data = response.json()
-        events.extend(data.get("events", []))
-        total_pages = data.get("total_pages") or 1
-        if params["page"] >= total_pages:
-            break
-        params["page"] += 1
+    first = fetch_page(session, params, 1)
+    events: List[dict] = list(first.get("events", []))
+    total_pages = first.get("total_pages") or 1
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, total_pages - 1))) as pool:
+            pages = pool.map(
+                lambda page: fetch_page(session, params, page), range(2, total_pages + 1)
+            )
+            for data in pages:
+                events.extend(data.get("events", []))
     return events
 
 
@@ -199,7 +93,12 @@ def build_labels(item: dict) -> List[str]:
     return normalize_labels(labels)
 
 
-def build_event_entry(item: dict) -> EventEntry:
+def detect_item_styles(item: dict, labels: Sequence[str], host: str) -> List[str]:
+    detail_text = clean_text(item.get("description"))
+    return detect_styles(item.get("title"), labels, detail_text, host)
+
+
+def build_event_entry(item: dict, with_styles: bool = True) -> EventEntry:
     start_text = item.get("start_date")
     start_dt = datetime.fromisoformat(start_text) if start_text else None
     date_value = start_dt.date().isoformat() if start_dt else ""
@@ -210,7 +109,6 @@ def build_event_entry(item: dict) -> EventEntry:
     flyer = image.get("url") or ""
     labels = build_labels(item)
     host = build_host(item.get("organizer"))
-    detail_text = clean_text(item.get("description"))
     return EventEntry(
         date=date_value,
         time=time_value,
@@ -222,54 +120,51 @@ def build_event_entry(item: dict) -> EventEntry:
         region=determine_region(city),
         source="bachata-bern.ch",
         labels=labels,
-        style=detect_styles(item.get("title"), labels, detail_text, host),
+        style=detect_item_styles(item, labels, host) if with_styles else (),
     )
 
 
-def write_csv(events: Sequence[EventEntry]) -> None:
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with OUTPUT_PATH.open("w", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(handle, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        for event in events:
-            writer.writerow(event.to_row())
+def list_items(context: CrawlContext) -> List[dict]:
+    return fetch_events(context.session)
 
 
-def main() -> None:
-    enable_http_logging()
-    session = requests.Session()
-    raw_events = fetch_events(session)
-    if not raw_events:
-        raise SystemExit("No events retrieved from bachata-bern.ch")
-    target_end_date = date.today() + timedelta(days=TARGET_DAY_SPAN)
-    seen_keys = set()
-    collected: List[EventEntry] = []
-    for item in raw_events:
-        entry = build_event_entry(item)
-        if not entry.date:
-            continue
-        event_date = datetime.strptime(entry.date, "%Y-%m-%d").date()
-        if event_date > target_end_date:
-            continue
-        if event_date < date.today():
-            continue
-        key = (entry.date, entry.time, entry.name, entry.city)
-        if key in seen_keys:
-            continue
-        seen_keys.add(key)
-        collected.append(entry)
-    if not collected:
-        raise SystemExit("No events collected from bachata-bern.ch")
-    collected.sort(
-        key=lambda item: (
-            item.date,
-            clean_text(item.time),
-            item.name.lower(),
-        )
+def build_event(item: dict) -> Optional[EventEntry]:
+    entry = build_event_entry(item, with_styles=False)
+    if not entry.date:
+        return None
+    event_date = datetime.strptime(entry.date, "%Y-%m-%d").date()
+    if not date.today() <= event_date <= date.today() + timedelta(days=TARGET_DAY_SPAN):
+        return None
+    return entry
+
+
+def fetch_detail(context: CrawlContext, event: EventEntry, item: dict) -> str:
+    text = clean_text(item.get("description"))
+    # Keep the descriptions next to the latino.ch detail texts so styles can be
+    # re-classified later without crawling again.
+    context.cache.put(event.url, text, event.date)
+    return text
+
+
+PLUGIN = register(
+    SourcePlugin(
+        name="bachata-bern.ch",
+        output_path=OUTPUT_PATH,
+        list_items=list_items,
+        fetch_detail=fetch_detail,
+        build_event=build_event,
+        priority=20,
     )
-    write_csv(collected)
-    print(f"Wrote {len(collected)} events to {OUTPUT_PATH}")
+)
+
+
+def main(incremental: bool = False) -> None:
+    enable_http_logging()
+    try:
+        crawl([PLUGIN], incremental=incremental, fallback=False)
+    except CrawlError as exc:
+        raise SystemExit(str(exc))
 
 
 if __name__ == "__main__":
-    main()
+    main(incremental=parse_crawl_args("Crawl bachata-bern.ch events.").incremental)
@@ -1,39 +1,39 @@
-import csv
 import re
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from typing import Iterable, List, Optional, Sequence, Tuple
 from urllib.parse import urljoin
 
 from crawl_settings import (
+    CrawlError,
     DATA_DIR,
     DEFAULT_HEADERS,
-    build_headers,
-    FIELDNAMES,
     enable_http_logging,
+    parse_crawl_args,
     TARGET_DAY_SPAN,
 )
-from style_detection import detect_styles, styles_to_cell
+from detail_cache import DetailCache
+from detail_text import extract_detail_text
+from engine import CrawlContext, SourcePlugin, crawl, register
+from event_entry import EventEntry
+from instrumentation import count, timer
+from normalize import clean_text, normalize_labels
+from regions import determine_region
+from throttle import HostRateLimiter
 import requests
 from bs4 import BeautifulSoup, Tag
 
-LABEL_REPLACEMENTS = {
-    "social dance": "party",
-    "bachata party schweiz": "party",
-}
+try:
+    import lxml  # noqa: F401
 
+    LISTING_PARSER = "lxml"
+except ImportError:
+    LISTING_PARSER = "html.parser"
 
-def normalize_labels(raw_labels: Iterable[str]) -> List[str]:
-    normalized = []
-    for label in raw_labels:
-        value = label.lower().strip()
-        value = LABEL_REPLACEMENTS.get(value, value)
-        if value and value not in normalized:
-            normalized.append(value)
-    return normalized
-
-
-def apply_name_rules(name: str, labels: List[str], host: str = "") -> List[str]:
+def apply_name_rules(name: str, labels: Sequence[str], host: str = "") -> List[str]:
+    # A copy: the items of a cluster share one label list, the rules apply per item.
+    labels = list(labels)
     cleaned_name = name.lower()
     cleaned_host = host.lower()
     if "dancing queens" in cleaned_name and "shopping" not in labels:
@@ -46,40 +46,11 @@ BASE_URL = "https://www.latino.ch"
 LISTING_PATH = "/events"
 OUTPUT_PATH = DATA_DIR / "events_latino_ch.csv"
 HEADERS = DEFAULT_HEADERS
-
-
-@dataclass
-class EventEntry:
-    date: str
-    time: str
-    name: str
-    flyer: str
-    url: str
-    host: str
-    city: str
-    region: str
-    source: str
-    labels: Sequence[str]
-    style: Sequence[str] = ()
-
-    def to_row(self) -> dict:
-        return {
-            "date": self.date,
-            "time": self.time,
-            "name": self.name,
-            "flyer": self.flyer,
-            "url": self.url,
-            "host": self.host,
-            "city": self.city,
-            "region": self.region,
-            "source": self.source,
-            "style": styles_to_cell(self.style),
-            "labels": "|".join(sorted(set(self.labels))),
-        }
+DATE_HEADER_PATTERN = re.compile(r"""<h3\b[^>]*?\bdata-date\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
 
 
 def fetch_chunk(session: requests.Session, params: dict) -> str:
-    headers = build_headers()
+    headers = {}
     if params.get("format") == "js":
         headers.update(
             {
@@ -94,14 +65,8 @@ def fetch_chunk(session: requests.Session, params: dict) -> str:
     return response.text
 
 
-def clean_text(value: Optional[str]) -> str:
-    if not value:
-        return ""
-    return re.sub(r"\s+", " ", value).strip()
-
-
 def extract_address(event_div: Tag) -> Tuple[str, str]:
-    address = event_div.select_one(".address")
+    address = event_div.find(class_="address")
     if not address:
         return "", ""
     host = ""
@@ -115,6 +80,19 @@ def extract_address(event_div: Tag) -> Tuple[str, str]:
     return host, city
 
 
+def extract_labels(event_div: Tag) -> List[str]:
+    texts = (clean_text(label.get_text()) for label in event_div.find_all(class_="label"))
+    return normalize_labels([text for text in texts if text])
+
+
+def find_time_span(event_div: Tag) -> Optional[Tag]:
+    # Same as select_one(".col-xs-5 span") without going through the CSS engine.
+    for span in event_div.find_all("span"):
+        if any("col-xs-5" in parent.get("class", ()) for parent in span.parents):
+            return span
+    return None
+
+
 def extract_url(event_div: Tag) -> str:
     parent_link = event_div.find_parent("a", href=True)
     if parent_link:
@@ -132,90 +110,37 @@ def extract_flyer(event_div: Tag) -> str:
     return urljoin(BASE_URL, img_tag["src"])
 
 
-def determine_region(city_text: str) -> str:
-    if not city_text:
-        return "Region Zürich"
-    lc = city_text.lower()
-    city_based = {
-        "bern": "Region Bern",
-        "thun": "Region Bern",
-        "biel": "Region Bern",
-        "fribourg": "Region Bern",
-        "fribourg/fribourg": "Region Bern",
-        "fribourg/friburg": "Region Bern",
-        "friburg": "Region Bern",
-        "düdingen": "Region Bern",        
-        "zürich": "Region Zürich",
-        "zuerich": "Region Zürich",
-        "zurich": "Region Zürich",
-        "winterthur": "Region Zürich",
-        "schaffhausen": "Ost Schweiz",
-        "luzern": "Zentral Schweiz",
-        "kriens": "Zentral Schweiz",
-        "rotkreuz": "Zentral Schweiz",
-        "zug": "Zentral Schweiz",
-        "solothurn": "Region Solothurn & Aarau",
-        "aarau": "Region Solothurn & Aarau",
-        "wohlen": "Region Solothurn & Aarau",
-        "olten": "Region Solothurn & Aarau",
-        "st. gallen": "Ost Schweiz",
-        "st gallen": "Ost Schweiz",
-        "st.gallen": "Ost Schweiz",
-        "chur": "Ost Schweiz",
-        "konstanz": "Ost Schweiz",
-        "rapperswil-jona": "Ost Schweiz",
-        "lausanne": "West Schweiz",
-        "geneva": "West Schweiz",
-        "genève": "West Schweiz",
-        "neuchâtel": "West Schweiz",
-        "neuchatel": "West Schweiz",
-        "sion": "Wallis",
-        "martigny": "Wallis",
-        "brig": "Wallis",        
-        "lugano": "Tessin",
-        "locarno": "Tessin",
-        "basel": "Region Basel",
-    }
-    for needle, region in city_based.items():
-        if needle in lc:
-            return region
-    match = re.search(r"(\d{4})", city_text)
-    if match:
-        plz = int(match.group(1))
-        if 1000 <= plz < 1700 or 2000 <= plz < 3000:
-            return "West Schweiz"
-        if 1700 <= plz < 1800 or 3000 <= plz < 3900:
-            return "Region Bern"
-        if 1800 <= plz < 2000 or 3900 <= plz < 4000:
-            return "Wallis"     
-        if 4000 <= plz < 4500:
-            return "Region Basel"                   
-        if 4500 <= plz < 6000:
-            return "Region Solothurn & Aarau"
-        if 6000 <= plz < 6500:
-            return "Zentral Schweiz"
-        if 6500 <= plz < 7000:
-            return "Tessin"
-        if 7000 <= plz < 8000 or 8200 <= plz :
-            return "Ost Schweiz"
-    return "Region Zürich"
-
-
-def fetch_detail_text(session: requests.Session, url: str, cache: dict[str, str]) -> str:
+def fetch_detail_text(
+    session: requests.Session,
+    url: str,
+    cache: DetailCache,
+    limiter: Optional[HostRateLimiter] = None,
+    event_date: str = "",
+) -> str:
     if not url:
         return ""
-    if url in cache:
-        return cache[url]
+    cached = cache.get(url)
+    if cached and cache.is_fresh(cached):
+        cache.record_hit()
+        return cached.text
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+    if limiter:
+        limiter.wait(url)
     try:
-        response = session.get(url, headers=build_headers(), timeout=20)
+        response = session.get(url, headers=headers, timeout=20)
+        if response.status_code == 304 and cached:
+            cache.refresh(url, response.headers, event_date)
+            return cached.text
         response.raise_for_status()
     except requests.RequestException:
-        cache[url] = ""
-        return ""
-    soup = BeautifulSoup(response.text, "html.parser")
-    detail_scope = soup.find(attrs={"itemtype": "http://schema.org/Event"}) or soup
-    text = clean_text(detail_scope.get_text(" "))[:8000]
-    cache[url] = text
+        cache.remember_failure(url)
+        return cached.text if cached else ""
+    text = extract_detail_text(response.text)
+    cache.store(url, text, response.headers, event_date)
     return text
 
 
@@ -223,26 +148,21 @@ def build_events_from_cluster(event_div: Tag, event_date: str) -> Iterable[Event
     host, city = extract_address(event_div)
     flyer = extract_flyer(event_div)
     url = extract_url(event_div)
-    labels = normalize_labels(
-        [
-            clean_text(label.get_text())
-            for label in event_div.select(".label")
-            if clean_text(label.get_text())
-        ]
-    )
+    labels = extract_labels(event_div)
     region = determine_region(city)
-    title_block = event_div.select_one(".title")
+    title_block = event_div.find(class_="title")
     if not title_block:
         return []
     entries: List[EventEntry] = []
-    for item in title_block.select("li"):
-        li_copy = BeautifulSoup(str(item), "html.parser")
-        span = li_copy.find("span")
+    for item in title_block.find_all("li"):
+        span = item.find("span")
         time_text = ""
+        skipped: set[int] = set()
         if span:
             time_text = clean_text(span.get_text())
-            span.extract()
-        name_text = clean_text(li_copy.get_text())
+            skipped = {id(text) for text in span.strings}
+        # The item text without its time span, read in place instead of re-parsing a copy.
+        name_text = clean_text("".join(text for text in item.strings if id(text) not in skipped))
         if not name_text:
             continue
         entries.append(
@@ -267,16 +187,10 @@ def build_event_from_block(event_div: Tag, event_date: str) -> Iterable[EventEnt
     if "cluster" in classes:
         return build_events_from_cluster(event_div, event_date)
     host, city = extract_address(event_div)
-    time_el = event_div.select_one(".col-xs-5 span")
-    title_el = event_div.select_one(".title")
+    time_el = find_time_span(event_div)
+    title_el = event_div.find(class_="title")
     name = clean_text(title_el.get_text() if title_el else "")
-    labels = normalize_labels(
-        [
-            clean_text(label.get_text())
-            for label in event_div.select(".label")
-            if clean_text(label.get_text())
-        ]
-    )
+    labels = extract_labels(event_div)
     labels = apply_name_rules(name, labels, host)
     region = determine_region(city)
     return [
@@ -295,100 +209,139 @@ def build_event_from_block(event_div: Tag, event_date: str) -> Iterable[EventEnt
     ]
 
 
+def is_date_header_or_event(tag: Tag) -> bool:
+    if tag.name == "h3":
+        return tag.has_attr("data-date")
+    return tag.name == "div" and "event" in tag.get("class", [])
+
+
 def parse_events(html: str) -> Tuple[List[EventEntry], List[str]]:
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, LISTING_PARSER)
     chunk_events: List[EventEntry] = []
-    for event_div in soup.select("div.event"):
-        header = event_div.find_previous("h3", attrs={"data-date": True})
-        if not header:
+    date_markers: List[str] = []
+    event_date: Optional[str] = None
+    # Single pass in document order: every event belongs to the last date header seen.
+    for tag in soup.find_all(is_date_header_or_event):
+        if tag.name == "h3":
+            event_date = tag.get("data-date")
+            marker = clean_text(event_date)
+            if marker:
+                date_markers.append(marker)
             continue
-        event_date = header.get("data-date")
         if not event_date:
             continue
-        for entry in build_event_from_block(event_div, event_date.strip()):
-            chunk_events.append(entry)
-    date_markers = [
-        clean_text(h.get("data-date")) for h in soup.select("h3[data-date]")
-    ]
-    date_markers = [d for d in date_markers if d]
+        chunk_events.extend(build_event_from_block(tag, event_date.strip()))
     return chunk_events, date_markers
 
 
-def enrich_styles(session: requests.Session, events: Sequence[EventEntry]) -> None:
-    detail_cache: dict[str, str] = {}
-    for event in events:
-        detail_text = fetch_detail_text(session, event.url, detail_cache)
-        event.style = detect_styles(event.name, event.labels, detail_text, event.host)
+def scroll_params(last_date: str) -> dict:
+    return {"locale": "de", "format": "js", "filter[last_date]": last_date}
 
 
-def write_csv(events: Sequence[EventEntry]) -> None:
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with OUTPUT_PATH.open("w", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(handle, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        for event in events:
-            writer.writerow(event.to_row())
+def peek_last_date(html: str) -> Optional[str]:
+    """Cheap guess of the next scroll cursor, read with a regex before the chunk is parsed."""
+    markers = [clean_text(value) for value in DATE_HEADER_PATTERN.findall(html)]
+    markers = [marker for marker in markers if marker]
+    return markers[-1] if markers else None
 
 
-def main() -> None:
-    enable_http_logging()
-    session = requests.Session()
-    params = {"locale": "de"}
-    html = fetch_chunk(session, params)
+def timed_fetch_chunk(session: requests.Session, params: dict) -> Tuple[str, float]:
+    started = time.perf_counter()
+    with timer("latino.ch.fetch"):
+        html = fetch_chunk(session, params)
+    return html, time.perf_counter() - started
+
+
+def collect_listing(session: requests.Session) -> List[EventEntry]:
+    """
+    Page through the infinite-scroll listing. The request for the next chunk is
+    sent as soon as its cursor is visible in the raw HTML, so it is in flight
+    while the current chunk is parsed. If the parsed cursor turns out to differ
+    the speculative response is dropped and the chunk is fetched again.
+    """
     seen_keys = set()
     collected: List[EventEntry] = []
-    min_date: Optional[date] = None
     max_date: Optional[date] = None
     target_end_date = date.today() + timedelta(days=TARGET_DAY_SPAN)
     last_date_for_scroll: Optional[str] = None
     attempts_without_new = 0
-    while True:
-        chunk_events, chunk_dates = parse_events(html)
-        added_this_round = 0
-        for entry in chunk_events:
-            key = (entry.date, entry.time, entry.name, entry.city)
-            if key in seen_keys:
-                continue
-            seen_keys.add(key)
-            collected.append(entry)
-            event_date = datetime.strptime(entry.date, "%Y-%m-%d").date()
-            min_date = event_date if min_date is None else min(min_date, event_date)
-            max_date = event_date if max_date is None else max(max_date, event_date)
-            added_this_round += 1
-        if chunk_dates:
-            last_date_for_scroll = chunk_dates[-1]
-        if max_date and max_date >= target_end_date:
-            break
-        if not chunk_dates or not last_date_for_scroll:
-            break
-        if added_this_round == 0:
-            attempts_without_new += 1
-            if attempts_without_new >= 2:
+    pages = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as fetcher:
+        html, fetch_seconds = timed_fetch_chunk(session, {"locale": "de"})
+        while True:
+            pages += 1
+            guess = peek_last_date(html)
+            prefetch = fetcher.submit(timed_fetch_chunk, session, scroll_params(guess)) if guess else None
+            parse_started = time.perf_counter()
+            with timer("latino.ch.parse"):
+                chunk_events, chunk_dates = parse_events(html)
+            added_this_round = 0
+            for entry in chunk_events:
+                key = (entry.date, entry.time, entry.name, entry.city)
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                collected.append(entry)
+                event_date = datetime.strptime(entry.date, "%Y-%m-%d").date()
+                max_date = event_date if max_date is None else max(max_date, event_date)
+                added_this_round += 1
+            print(
+                f"latino.ch chunk {pages}: fetched in {fetch_seconds:.2f}s, "
+                f"parsed in {time.perf_counter() - parse_started:.2f}s, {added_this_round} new events"
+            )
+            if chunk_dates:
+                last_date_for_scroll = chunk_dates[-1]
+            if max_date and max_date >= target_end_date:
                 break
-        else:
-            attempts_without_new = 0
-        params = {"locale": "de", "format": "js", "filter[last_date]": last_date_for_scroll}
-        html = fetch_chunk(session, params)
-        if not html.strip():
-            break
-    if not collected:
-        raise SystemExit("No events collected from latino.ch")
-    collected.sort(
-        key=lambda item: (
-            item.date,
-            clean_text(item.time),
-            item.name.lower(),
-        )
-    )
-    enrich_styles(session, collected)
-    write_csv(collected)
-    span_desc = (
-        f"{min_date.isoformat()} – {max_date.isoformat()}"
-        if min_date and max_date
-        else "unknown range"
+            if not chunk_dates or not last_date_for_scroll:
+                break
+            if added_this_round == 0:
+                attempts_without_new += 1
+                if attempts_without_new >= 2:
+                    break
+            else:
+                attempts_without_new = 0
+            if prefetch and guess == last_date_for_scroll:
+                html, fetch_seconds = prefetch.result()
+            else:
+                html, fetch_seconds = timed_fetch_chunk(session, scroll_params(last_date_for_scroll))
+            if not html.strip():
+                break
+    count("latino.ch.pages", pages)
+    print(f"latino.ch listing: {pages} pages in {time.perf_counter() - started:.2f}s")
+    return collected
+
+
+def list_items(context: CrawlContext) -> List[EventEntry]:
+    return collect_listing(context.session)
+
+
+def fetch_detail(context: CrawlContext, event: EventEntry, item: EventEntry) -> str:
+    return fetch_detail_text(context.session, event.url, context.cache, context.limiter, event.date)
+
+
+PLUGIN = register(
+    SourcePlugin(
+        name="latino.ch",
+        output_path=OUTPUT_PATH,
+        list_items=list_items,
+        fetch_detail=fetch_detail,
+        priority=10,
+        share_series_details=True,
     )
-    print(f"Wrote {len(collected)} events covering {span_desc} to {OUTPUT_PATH}")
+)
+
+
+def main(incremental: bool = False) -> None:
+    enable_http_logging()
+    try:
+        [collected] = crawl([PLUGIN], incremental=incremental, fallback=False)
+    except CrawlError as exc:
+        raise SystemExit(str(exc))
+    span_desc = f"{collected[0].date} – {collected[-1].date}"
+    print(f"Crawled {len(collected)} events covering {span_desc}")
 
 
 if __name__ == "__main__":
-    main()
+    main(incremental=parse_crawl_args("Crawl latino.ch events.").incremental)
@@ -1,3 +1,4 @@
+import argparse
 import http.client
 import logging
 from pathlib import Path
@@ -5,6 +6,19 @@ from typing import Optional
 
 TARGET_DAY_SPAN = 90
 
+# Detail pages are fetched concurrently; keep the per-host rate polite.
+DETAIL_FETCH_WORKERS = 8
+DETAIL_REQUESTS_PER_SECOND = 8.0
+
+# Shared HTTP client: pooled keep-alive connections, retries with exponential
+# backoff (backoff_factor * 2 ** retry, plus up to HTTP_BACKOFF_JITTER seconds).
+HTTP_POOL_SIZE = 16
+HTTP_RETRIES = 4
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_BACKOFF_JITTER = 0.5
+# Longest Retry-After wait, in seconds, honoured per attempt.
+HTTP_MAX_RETRY_AFTER = 30
+
 FIELDNAMES = [
     "date",
     "time",
@@ -25,6 +39,22 @@ DEFAULT_HEADERS = {
 DATA_DIR = Path("data")
 PUBLIC_DIR = Path("public")
 
+# Detail pages are cached across runs and revalidated with conditional requests
+# once the TTL (or the server's max-age) has passed.
+DETAIL_CACHE_PATH = DATA_DIR / "detail_cache.sqlite"
+DETAIL_CACHE_TTL_HOURS = 6
+
+ALL_EVENTS_PATH = DATA_DIR / "events.csv"
+
+# Every merged event ever seen, with first/last seen timestamps and the run history.
+EVENT_STORE_PATH = DATA_DIR / "events.sqlite"
+
+
+
+class CrawlError(RuntimeError):
+    """Raised by a source crawler when it cannot produce any events."""
+
+
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/128.0.",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; Firefox/127.0",
@@ -52,7 +82,7 @@ USER_AGENTS = [
 def build_headers(extra: Optional[dict] = None) -> dict:
     """
     Create a request header set with a realistic, randomly chosen User-Agent.
-    Use per-request to vary the client fingerprint.
+    build_session applies it once, so a session keeps one client fingerprint.
     """
     import random  # local to avoid polluting crawler modules
 
@@ -71,3 +101,17 @@ def enable_http_logging() -> None:
     logging.basicConfig(level=logging.WARN)
     logging.getLogger("urllib3").setLevel(logging.WARN)
     logging.getLogger("requests").setLevel(logging.WARN)
+
+
+def build_arg_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-run style detection for events that are new or changed since the last CSV",
+    )
+    return parser
+
+
+def parse_crawl_args(description: str) -> argparse.Namespace:
+    return build_arg_parser(description).parse_args()
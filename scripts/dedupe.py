@@ -0,0 +1,86 @@
+import re
+from difflib import SequenceMatcher
+from typing import Iterable, Iterator, Optional
+
+NGRAM_SIZE = 3
+
+
+def normalize_name(name: str) -> str:
+    # Lowercase and strip punctuation/extra whitespace for fuzzy comparison.
+    cleaned = re.sub(r"[^a-z0-9]+", " ", name.lower())
+    return cleaned.strip()
+
+
+def names_similar(a: str, b: str, threshold: float = 1) -> bool:
+    if not a or not b:
+        return False
+    if normalize_name(a) == normalize_name(b):
+        return True
+    return SequenceMatcher(None, normalize_name(a), normalize_name(b)).ratio() >= threshold
+
+
+def name_ngrams(normalized: str) -> set[str]:
+    compact = normalized.replace(" ", "")
+    if len(compact) <= NGRAM_SIZE:
+        return {compact}
+    return {compact[i : i + NGRAM_SIZE] for i in range(len(compact) - NGRAM_SIZE + 1)}
+
+
+class DedupeIndex:
+    """
+    Accepted event names bucketed by date. Exact matches on the normalized name
+    are a set lookup; fuzzy matching (threshold below 1) only scores names of
+    the same date that share a character trigram, cheapest bound first.
+    """
+
+    def __init__(self, threshold: float = 1) -> None:
+        self.threshold = threshold
+        self._exact: set[tuple[str, str]] = set()
+        self._blocks: dict[str, dict[str, list[str]]] = {}
+
+    def _fuzzy_match(self, event_date: str, normalized: str) -> bool:
+        blocks = self._blocks.get(event_date)
+        if not blocks:
+            return False
+        matcher = SequenceMatcher(None, b=normalized)
+        checked: set[str] = set()
+        for gram in name_ngrams(normalized):
+            for candidate in blocks.get(gram, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                matcher.set_seq1(candidate)
+                if (
+                    matcher.real_quick_ratio() >= self.threshold
+                    and matcher.quick_ratio() >= self.threshold
+                    and matcher.ratio() >= self.threshold
+                ):
+                    return True
+        return False
+
+    def add(self, event_date: str, name: str) -> bool:
+        """Record the event and return True unless it duplicates an accepted one."""
+        normalized = normalize_name(name)
+        key = (event_date, normalized)
+        if key in self._exact:
+            return False
+        if self.threshold < 1 and self._fuzzy_match(event_date, normalized):
+            return False
+        self._exact.add(key)
+        if self.threshold < 1:
+            blocks = self._blocks.setdefault(event_date, {})
+            for gram in name_ngrams(normalized):
+                blocks.setdefault(gram, []).append(normalized)
+        return True
+
+
+def unique_events(
+    events: Iterable, threshold: float = 1, index: Optional[DedupeIndex] = None
+) -> Iterator:
+    """Yield events in order, skipping undated/unnamed ones and duplicates of earlier ones."""
+    index = index or DedupeIndex(threshold)
+    for event in events:
+        if not event.date or not event.name:
+            continue
+        if index.add(event.date, event.name):
+            yield event
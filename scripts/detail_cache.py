@@ -0,0 +1,265 @@
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional, Tuple
+
+from crawl_settings import DETAIL_CACHE_PATH, DETAIL_CACHE_TTL_HOURS
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CachedDetail:
+    text: str
+    etag: str = ""
+    last_modified: str = ""
+    expires_at: float = 0.0
+    event_date: str = ""
+
+
+def expiry_from_headers(headers: dict, now: float, default_ttl: float) -> float:
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return now
+    match = MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        return now + int(match.group(1))
+    return now + default_ttl
+
+
+class DetailCache:
+    """
+    Extracted detail-page text keyed by URL, persisted in SQLite between runs.
+    Entries are loaded into memory on open and only changed rows are written
+    back on save(), so worker threads never touch the database directly.
+    Aliases point an occurrence of a recurring series at the page that was
+    fetched for the series; they only serve text(), never HTTP revalidation.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = DETAIL_CACHE_PATH,
+        ttl_hours: float = DETAIL_CACHE_TTL_HOURS,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.entries: dict[str, CachedDetail] = {}
+        # url -> (url of the page holding its text, event date)
+        self.aliases: dict[str, Tuple[str, str]] = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.errors = 0
+        self.evicted = 0
+        self._dirty: set[str] = set()
+        self._removed: set[str] = set()
+        self._dirty_aliases: set[str] = set()
+        self._removed_aliases: set[str] = set()
+        self._lock = threading.Lock()
+        if path and path.exists():
+            self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS detail_pages (
+                url TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                etag TEXT NOT NULL DEFAULT '',
+                last_modified TEXT NOT NULL DEFAULT '',
+                expires_at REAL NOT NULL DEFAULT 0,
+                event_date TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS detail_aliases (
+                url TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                event_date TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        return connection
+
+    def _load(self) -> None:
+        connection = self._connect()
+        rows = connection.execute(
+            "SELECT url, text, etag, last_modified, expires_at, event_date FROM detail_pages"
+        )
+        for url, text, etag, last_modified, expires_at, event_date in rows:
+            self.entries[url] = CachedDetail(text, etag, last_modified, expires_at, event_date)
+        for url, source, event_date in connection.execute(
+            "SELECT url, source, event_date FROM detail_aliases"
+        ):
+            self.aliases[url] = (source, event_date)
+        connection.close()
+
+    def get(self, url: str) -> Optional[CachedDetail]:
+        return self.entries.get(url)
+
+    def text(self, url: str) -> str:
+        """The url's own text, else the text of the series page it is an alias of."""
+        entry = self.entries.get(url)
+        if entry is None and url in self.aliases:
+            entry = self.entries.get(self.aliases[url][0])
+        return entry.text if entry else ""
+
+    def has_text(self, url: str) -> bool:
+        return url in self.entries or (url in self.aliases and self.aliases[url][0] in self.entries)
+
+    def alias(self, url: str, source: str, event_date: str = "") -> None:
+        """Let url share the text of source without touching url's own entry."""
+        if not url or url == source:
+            return
+        with self._lock:
+            if self.aliases.get(url, (None,))[0] == source:
+                return
+            self.aliases[url] = (source, event_date)
+            self._dirty_aliases.add(url)
+            self._removed_aliases.discard(url)
+
+    def is_fresh(self, entry: CachedDetail, now: Optional[float] = None) -> bool:
+        return entry.expires_at > (now if now is not None else time.time())
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def store(
+        self,
+        url: str,
+        text: str,
+        headers: dict,
+        event_date: str = "",
+    ) -> None:
+        now = time.time()
+        entry = CachedDetail(
+            text=text,
+            etag=headers.get("ETag") or "",
+            last_modified=headers.get("Last-Modified") or "",
+            expires_at=expiry_from_headers(headers, now, self.ttl_seconds),
+            event_date=event_date,
+        )
+        with self._lock:
+            self.misses += 1
+            self._keep(url, entry)
+
+    def put(self, url: str, text: str, event_date: str = "") -> None:
+        """Store text that arrived with a listing rather than from a detail request."""
+        if not url:
+            return
+        with self._lock:
+            self._keep(url, CachedDetail(text=text, event_date=event_date))
+
+    def refresh(self, url: str, headers: dict, event_date: str = "") -> None:
+        """Extend an entry after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self.revalidated += 1
+            entry = self.entries[url]
+            entry.etag = headers.get("ETag") or entry.etag
+            entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+            entry.expires_at = expiry_from_headers(headers, now, self.ttl_seconds)
+            entry.event_date = max(entry.event_date, event_date)
+            self._dirty.add(url)
+
+    def remember_failure(self, url: str) -> None:
+        """Keep a failed URL from being retried within this run without persisting it."""
+        with self._lock:
+            self.errors += 1
+            if url not in self.entries:
+                self.entries[url] = CachedDetail(text="", expires_at=time.time() + self.ttl_seconds)
+
+    def _keep(self, url: str, entry: CachedDetail) -> None:
+        previous = self.entries.get(url)
+        if previous:
+            entry.event_date = max(entry.event_date, previous.event_date)
+        self.entries[url] = entry
+        self._dirty.add(url)
+        self._removed.discard(url)
+
+    def evict_past(self, today: Optional[date] = None) -> int:
+        cutoff = (today or date.today()).isoformat()
+        stale = [
+            url
+            for url, entry in self.entries.items()
+            if entry.event_date and entry.event_date < cutoff
+        ]
+        with self._lock:
+            for url in stale:
+                del self.entries[url]
+                self._dirty.discard(url)
+                self._removed.add(url)
+            self.evicted += len(stale)
+            past_aliases = [
+                url
+                for url, (_, event_date) in self.aliases.items()
+                if event_date and event_date < cutoff
+            ]
+            for url in past_aliases:
+                del self.aliases[url]
+                self._dirty_aliases.discard(url)
+                self._removed_aliases.add(url)
+        return len(stale)
+
+    def save(self) -> None:
+        if not self.path or not (
+            self._dirty or self._removed or self._dirty_aliases or self._removed_aliases
+        ):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "DELETE FROM detail_pages WHERE url = ?",
+                [(url,) for url in self._removed],
+            )
+            connection.executemany(
+                """
+                INSERT OR REPLACE INTO detail_pages
+                    (url, text, etag, last_modified, expires_at, event_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        url,
+                        entry.text,
+                        entry.etag,
+                        entry.last_modified,
+                        entry.expires_at,
+                        entry.event_date,
+                    )
+                    for url, entry in self.entries.items()
+                    if url in self._dirty
+                ],
+            )
+            connection.executemany(
+                "DELETE FROM detail_aliases WHERE url = ?",
+                [(url,) for url in self._removed_aliases],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO detail_aliases (url, source, event_date) VALUES (?, ?, ?)",
+                [(url, *self.aliases[url]) for url in self._dirty_aliases],
+            )
+        connection.close()
+        self._dirty.clear()
+        self._removed.clear()
+        self._dirty_aliases.clear()
+        self._removed_aliases.clear()
+
+    def summary(self) -> str:
+        lookups = self.hits + self.revalidated + self.misses
+        reused = self.hits + self.revalidated
+        rate = f"{reused / lookups:.0%}" if lookups else "n/a"
+        return (
+            f"Detail cache: {self.hits} hits, {self.revalidated} revalidated, "
+            f"{self.misses} misses, {self.errors} errors, {self.evicted} evicted "
+            f"(reuse rate {rate})"
+        )
@@ -0,0 +1,203 @@
+import html
+import json
+import re
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional
+
+from normalize import clean_text
+
+EVENT_ITEMTYPE = "http://schema.org/Event"
+DETAIL_TEXT_LIMIT = 8000
+JSON_LD_PATTERN = re.compile(
+    r"""<script\b[^>]*\btype\s*=\s*["']?application/ld\+json["']?[^>]*>(.*?)</script\s*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+# Elements without an end tag; they never open a level.
+VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+# Their contents are not page text (BeautifulSoup's get_text skips them too,
+# including ruby annotations).
+SKIPPED_ELEMENTS = frozenset(("script", "style", "template", "rt", "rp"))
+CDATA_PREFIX = "CDATA["
+
+
+class _Done(Exception):
+    pass
+
+
+class EventTextParser(HTMLParser):
+    """
+    Collects the text of the first schema.org Event element, or of the whole
+    page when there is none, without building a tree. Text nodes are joined
+    with spaces like get_text(" "). Feeding stops with _Done once the scope
+    closes or enough text is collected; with a scope found, the rest of the
+    page is never parsed.
+    """
+
+    def __init__(self, limit: int = DETAIL_TEXT_LIMIT) -> None:
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.page_parts: List[str] = []
+        self.scope_parts: Optional[List[str]] = None
+        self.stack: List[str] = []
+        self.scope_depth = -1
+        self.skipping = 0
+        self.node: List[str] = []
+        # Characters of scope text so far, counting one separator per text node.
+        self.collected = 0
+        self.next_check = limit
+
+    @property
+    def parts(self) -> List[str]:
+        return self.scope_parts if self.scope_parts is not None else self.page_parts
+
+    def flush(self) -> None:
+        if not self.node:
+            return
+        text = "".join(self.node)
+        self.node = []
+        self.parts.append(text)
+        if self.scope_parts is not None:
+            self.collected += len(text) + 1
+            # The raw length bounds the cleaned length, so cleaning is only worth it
+            # once the raw text could be long enough, and again only after that much more.
+            if self.collected >= self.next_check:
+                cleaned = len(clean_text(" ".join(self.scope_parts)))
+                if cleaned > self.limit:
+                    raise _Done
+                self.next_check = self.collected + self.limit - cleaned + 1
+
+    def is_scope(self, attrs: list) -> bool:
+        return self.scope_parts is None and dict(attrs).get("itemtype") == EVENT_ITEMTYPE
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self.flush()
+        if tag in VOID_ELEMENTS:
+            # <meta itemtype=...> is an empty scope, like <div itemtype=.../>.
+            self.handle_startendtag(tag, attrs)
+            return
+        self.stack.append(tag)
+        if tag in SKIPPED_ELEMENTS:
+            self.skipping += 1
+        if self.is_scope(attrs):
+            self.scope_parts = []
+            self.scope_depth = len(self.stack)
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        # <div/> is an empty element; text after it belongs to the parent.
+        self.flush()
+        if self.is_scope(attrs):
+            self.scope_parts = []
+            raise _Done
+
+    def handle_endtag(self, tag: str) -> None:
+        self.flush()
+        if tag not in self.stack:
+            return
+        # Like the html.parser tree builder: close everything up to the matching tag.
+        while self.stack:
+            closed = self.stack.pop()
+            if closed in SKIPPED_ELEMENTS:
+                self.skipping -= 1
+            if self.scope_parts is not None and len(self.stack) < self.scope_depth:
+                raise _Done
+            if closed == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if not self.skipping:
+            self.node.append(data)
+
+    # Comments, declarations and processing instructions end a text node
+    # without adding text.
+    def handle_comment(self, data: str) -> None:
+        self.flush()
+
+    def handle_decl(self, decl: str) -> None:
+        self.flush()
+
+    def handle_pi(self, data: str) -> None:
+        self.flush()
+
+    def unknown_decl(self, data: str) -> None:
+        self.flush()
+        if data.upper().startswith(CDATA_PREFIX):
+            # A CDATA section is a text node of its own; get_text keeps it
+            # even inside skipped elements.
+            self.node.append(data[len(CDATA_PREFIX) :])
+            self.flush()
+
+    def text(self, page: str) -> str:
+        try:
+            self.feed(page)
+            self.close()
+            self.flush()
+        except _Done:
+            self.node = []
+        return clean_text(" ".join(self.parts))[: self.limit]
+
+
+def json_ld_objects(page: str) -> Iterator[dict]:
+    for block in JSON_LD_PATTERN.findall(page):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        pending = data if isinstance(data, list) else [data]
+        while pending:
+            item = pending.pop(0)
+            if not isinstance(item, dict):
+                continue
+            yield item
+            graph = item.get("@graph")
+            if isinstance(graph, list):
+                pending.extend(graph)
+
+
+def is_event(item: dict) -> bool:
+    types = item.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(isinstance(value, str) and value.endswith("Event") for value in types)
+
+
+def json_ld_values(value) -> Iterator[str]:
+    """Name, description and nested names (location, organizer, performer) of a JSON-LD value."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from json_ld_values(item)
+    elif isinstance(value, dict):
+        for key in ("name", "description", "address", "addressLocality"):
+            if key in value:
+                yield from json_ld_values(value[key])
+
+
+def json_ld_event_text(page: str, limit: int = DETAIL_TEXT_LIMIT) -> Optional[str]:
+    """Text of the page's JSON-LD Event, or None if it has none."""
+    if "ld+json" not in page:
+        return None
+    for item in json_ld_objects(page):
+        if not is_event(item):
+            continue
+        parts = []
+        for key in ("name", "description", "location", "organizer", "performer"):
+            parts.extend(json_ld_values(item.get(key)))
+        # Descriptions often carry HTML markup and entities.
+        text = html.unescape(TAG_PATTERN.sub(" ", " ".join(parts)))
+        return clean_text(text)[:limit]
+    return None
+
+
+def extract_detail_text(page: str, limit: int = DETAIL_TEXT_LIMIT) -> str:
+    """
+    The text style detection reads from a detail page: the JSON-LD Event if
+    the page has one, else the schema.org Event element's text (or the whole
+    page's), whitespace-collapsed and cut to limit characters.
+    """
+    text = json_ld_event_text(page, limit)
+    if text is not None:
+        return text
+    return EventTextParser(limit).text(page)
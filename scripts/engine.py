@@ -0,0 +1,263 @@
+import asyncio
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from crawl_settings import (
+    CrawlError,
+    DETAIL_FETCH_WORKERS,
+    DETAIL_REQUESTS_PER_SECOND,
+    HTTP_POOL_SIZE,
+)
+from detail_cache import DetailCache
+from event_entry import EventEntry, write_csv
+from http_client import build_session
+from incremental import load_previous, reuse_previous_styles
+from instrumentation import METRICS, count, timer
+from normalize import clean_text
+from series import detect_series
+from style_detection import detect_styles_batch
+from throttle import HostRateLimiter
+
+
+@dataclass
+class CrawlContext:
+    """What the engine hands to every plugin hook. Shared by all sources of a run."""
+
+    session: requests.Session
+    cache: DetailCache
+    limiter: HostRateLimiter
+
+
+@dataclass
+class SourcePlugin:
+    """
+    One site. list_items returns the raw listing items, build_event turns an
+    item into an EventEntry (or None to drop it; items that already are
+    EventEntry objects need no build_event) and fetch_detail returns the text
+    used for style detection. Hooks are plain blocking functions; the engine
+    runs them in worker threads.
+    """
+
+    name: str
+    output_path: Path
+    list_items: Callable[[CrawlContext], Iterable[Any]]
+    fetch_detail: Callable[[CrawlContext, EventEntry, Any], str]
+    build_event: Optional[Callable[[Any], Optional[EventEntry]]] = None
+    # The merge keeps the first copy of an event, so lower priorities win.
+    priority: int = 100
+    # Fetch one detail page per recurring series. Only worth it when fetch_detail
+    # costs a request; sources with inline descriptions keep each occurrence's own.
+    share_series_details: bool = False
+
+
+REGISTRY: Dict[str, SourcePlugin] = {}
+
+
+def register(plugin: SourcePlugin) -> SourcePlugin:
+    if plugin.name in REGISTRY:
+        raise ValueError(f"Source {plugin.name} is already registered")
+    REGISTRY[plugin.name] = plugin
+    return plugin
+
+
+def registered_sources() -> List[SourcePlugin]:
+    return sorted(REGISTRY.values(), key=lambda plugin: (plugin.priority, plugin.name))
+
+
+def read_previous_events(path: Path) -> List[EventEntry]:
+    """Upcoming events of the last stored CSV, used when a source fails."""
+    if not path.exists():
+        return []
+    today = date.today().isoformat()
+    with path.open("r", newline="", encoding="utf-8") as handle:
+        return [
+            EventEntry.from_row(row)
+            for row in csv.DictReader(handle)
+            if (row.get("date") or "") >= today
+        ]
+
+
+def event_key(event: EventEntry) -> tuple:
+    return (event.date, event.time, event.name, event.city)
+
+
+def detail_key(event: EventEntry) -> str:
+    # Events without a URL cannot share a detail page.
+    return event.url or f"#{id(event)}"
+
+
+def detail_keys(events: Sequence[EventEntry], share_series: bool = True) -> Dict[int, str]:
+    """Detail page per event; with share_series, all occurrences of a recurring series share one page."""
+    keys = {id(event): detail_key(event) for event in events}
+    if not share_series:
+        return keys
+    for series in detect_series(events):
+        shared = detail_key(series.latest)
+        for event in series.events:
+            keys[id(event)] = shared
+    return keys
+
+
+class CrawlEngine:
+    """
+    Crawls the given sources concurrently on one event loop. Blocking HTTP
+    and parsing run in a shared thread pool; detail fetches of all sources
+    share one concurrency limit, the per-host rate limiter, one keep-alive
+    session and the detail cache.
+    """
+
+    def __init__(
+        self,
+        incremental: bool = False,
+        write_site_csv: bool = True,
+        fallback: bool = True,
+        detail_workers: int = DETAIL_FETCH_WORKERS,
+        requests_per_second: float = DETAIL_REQUESTS_PER_SECOND,
+    ) -> None:
+        self.incremental = incremental
+        self.write_site_csv = write_site_csv
+        self.fallback = fallback
+        self.detail_workers = detail_workers
+        self.requests_per_second = requests_per_second
+
+    def run(self, plugins: Sequence[SourcePlugin]) -> List[List[EventEntry]]:
+        """Events per plugin, in the order of plugins."""
+        return asyncio.run(self.crawl(plugins))
+
+    async def crawl(self, plugins: Sequence[SourcePlugin]) -> List[List[EventEntry]]:
+        cache = DetailCache()
+        cache.evict_past()
+        context = CrawlContext(
+            session=build_session(),
+            cache=cache,
+            limiter=HostRateLimiter(self.requests_per_second),
+        )
+        self.detail_slots = asyncio.Semaphore(self.detail_workers)
+        with ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE) as threads:
+            self.threads = threads
+            results = await asyncio.gather(
+                *(self.crawl_or_reuse(plugin, context) for plugin in plugins)
+            )
+        cache.save()
+        METRICS.record_cache(
+            "detail_cache",
+            hits=cache.hits + cache.revalidated,
+            misses=cache.misses,
+            revalidated=cache.revalidated,
+            errors=cache.errors,
+            evicted=cache.evicted,
+        )
+        print(cache.summary())
+        return list(results)
+
+    async def in_thread(self, func: Callable, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.threads, func, *args)
+
+    async def crawl_or_reuse(self, plugin: SourcePlugin, context: CrawlContext) -> List[EventEntry]:
+        """
+        Crawl one source and optionally write its CSV. With fallback, any
+        failure reuses the rows of the previous run so a single broken site
+        does not stop the refresh.
+        """
+        try:
+            events = await self.crawl_source(plugin, context)
+        except Exception as exc:
+            if not self.fallback:
+                raise
+            previous = read_previous_events(plugin.output_path)
+            print(f"{plugin.name} failed ({exc!r}); reusing {len(previous)} events from {plugin.output_path}")
+            count(f"{plugin.name}.failed")
+            return previous
+        if self.write_site_csv:
+            with timer(f"{plugin.name}.write"):
+                changed = await self.in_thread(write_csv, events, plugin.output_path)
+            status = "Wrote" if changed else "Unchanged:"
+            print(f"{status} {len(events)} {plugin.name} events in {plugin.output_path}")
+        else:
+            print(f"Collected {len(events)} {plugin.name} events")
+        return events
+
+    async def crawl_source(self, plugin: SourcePlugin, context: CrawlContext) -> List[EventEntry]:
+        with timer(f"{plugin.name}.listing"):
+            items = await self.in_thread(lambda: list(plugin.list_items(context)))
+        collected: List[EventEntry] = []
+        source_items: Dict[int, Any] = {}
+        seen_keys = set()
+        for item in items:
+            event = plugin.build_event(item) if plugin.build_event else item
+            if event is None or not event.date:
+                continue
+            key = event_key(event)
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            collected.append(event)
+            source_items[id(event)] = item
+        if not collected:
+            raise CrawlError(f"No events collected from {plugin.name}")
+        count(f"{plugin.name}.events", len(collected))
+        collected.sort(key=lambda event: (event.date, clean_text(event.time), event.name.lower()))
+        stale = collected
+        if self.incremental:
+            stale, diff = reuse_previous_styles(collected, load_previous(plugin.output_path))
+            print(diff.summary(plugin.name))
+        texts = await self.fetch_details(plugin, context, stale, source_items)
+        with timer(f"{plugin.name}.styles"):
+            styles = await self.in_thread(
+                detect_styles_batch,
+                [(event.name, event.labels, texts[id(event)], event.host) for event in stale],
+            )
+        for event, style in zip(stale, styles):
+            event.style = style
+        return collected
+
+    async def fetch_details(
+        self,
+        plugin: SourcePlugin,
+        context: CrawlContext,
+        events: Sequence[EventEntry],
+        source_items: Dict[int, Any],
+    ) -> Dict[int, str]:
+        """Detail text per event (by id), fetching each page once."""
+        keys = detail_keys(events, plugin.share_series_details)
+        # One fetch per detail page, for its latest event so the cache keeps the page longest.
+        targets: Dict[str, EventEntry] = {}
+        for event in events:
+            key = keys[id(event)]
+            if key not in targets or event.date >= targets[key].date:
+                targets[key] = event
+        count(f"{plugin.name}.detail_pages", len(targets))
+        # Occurrences that reuse the page of a later occurrence of their series.
+        count(f"{plugin.name}.series_reused", sum(keys[id(event)] != detail_key(event) for event in events))
+
+        async def fetch(event: EventEntry) -> str:
+            async with self.detail_slots:
+                return await self.in_thread(plugin.fetch_detail, context, event, source_items[id(event)])
+
+        with timer(f"{plugin.name}.details"):
+            fetched = await asyncio.gather(*(fetch(event) for event in targets.values()))
+        pages = dict(zip(targets, fetched))
+        texts = {}
+        for event in events:
+            key = keys[id(event)]
+            texts[id(event)] = pages[key]
+            if key != detail_key(event) and event.url and not key.startswith("#"):
+                # reclassify_styles.py finds the shared text through the alias; the
+                # occurrence's own cache entry and its validators stay untouched.
+                context.cache.alias(event.url, key, event.date)
+        return texts
+
+
+def crawl(
+    plugins: Sequence[SourcePlugin],
+    incremental: bool = False,
+    write_site_csv: bool = True,
+    fallback: bool = True,
+) -> List[List[EventEntry]]:
+    return CrawlEngine(incremental, write_site_csv, fallback).run(plugins)
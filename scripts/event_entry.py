@@ -0,0 +1,193 @@
+import csv
+import io
+from pathlib import Path
+from sys import intern
+from typing import IO, Iterable, List, Sequence, Tuple
+
+from crawl_settings import FIELDNAMES
+from output_files import write_if_changed
+from style_detection import styles_to_cell
+
+# Label and style lists repeat a handful of combinations; every event holding
+# the same combination shares one tuple.
+_SHARED_TUPLES: dict[Tuple[str, ...], Tuple[str, ...]] = {}
+_STYLE_CELLS: dict[Tuple[str, ...], str] = {}
+_LABEL_CELLS: dict[Tuple[str, ...], str] = {}
+
+
+def shared_tuple(values: Iterable[str]) -> Tuple[str, ...]:
+    key = tuple(intern(value) for value in values or ())
+    return _SHARED_TUPLES.setdefault(key, key)
+
+
+def split_cell(value: str) -> Tuple[str, ...]:
+    return shared_tuple(part for part in (value or "").split("|") if part)
+
+
+def style_cell(styles: Tuple[str, ...]) -> str:
+    cell = _STYLE_CELLS.get(styles)
+    if cell is None:
+        cell = _STYLE_CELLS[styles] = styles_to_cell(styles)
+    return cell
+
+
+def labels_cell(labels: Tuple[str, ...]) -> str:
+    cell = _LABEL_CELLS.get(labels)
+    if cell is None:
+        cell = _LABEL_CELLS[labels] = "|".join(sorted(set(labels)))
+    return cell
+
+
+class EventEntry:
+    """
+    One event of any source. Slotted, with the strings that repeat across
+    events (date, time, host, city, region, source, labels, style) interned.
+    """
+
+    __slots__ = (
+        "date",
+        "time",
+        "name",
+        "flyer",
+        "url",
+        "host",
+        "city",
+        "region",
+        "source",
+        "_labels",
+        "_style",
+    )
+
+    def __init__(
+        self,
+        date: str,
+        time: str,
+        name: str,
+        flyer: str,
+        url: str,
+        host: str,
+        city: str,
+        region: str,
+        source: str,
+        labels: Sequence[str],
+        style: Sequence[str] = (),
+    ) -> None:
+        self.date = intern(date or "")
+        self.time = intern(time or "")
+        self.name = name
+        self.flyer = flyer
+        self.url = url
+        self.host = intern(host or "")
+        self.city = intern(city or "")
+        self.region = intern(region or "")
+        self.source = intern(source or "")
+        self.labels = labels
+        self.style = style
+
+    @property
+    def labels(self) -> Tuple[str, ...]:
+        return self._labels
+
+    @labels.setter
+    def labels(self, value: Sequence[str]) -> None:
+        self._labels = shared_tuple(value)
+
+    @property
+    def style(self) -> Tuple[str, ...]:
+        return self._style
+
+    @style.setter
+    def style(self, value: Sequence[str]) -> None:
+        self._style = shared_tuple(value)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(FIELDNAMES, self.astuple()))
+        return f"EventEntry({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EventEntry):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    __hash__ = None
+
+    def astuple(self) -> tuple:
+        return (
+            self.date,
+            self.time,
+            self.name,
+            self.flyer,
+            self.url,
+            self.host,
+            self.city,
+            self.region,
+            self.source,
+            self._style,
+            self._labels,
+        )
+
+    def to_values(self) -> tuple:
+        """The CSV cells in FIELDNAMES order."""
+        return (
+            self.date,
+            self.time,
+            self.name,
+            self.flyer,
+            self.url,
+            self.host,
+            self.city,
+            self.region,
+            self.source,
+            style_cell(self._style),
+            labels_cell(self._labels),
+        )
+
+    def to_row(self) -> dict:
+        return dict(zip(FIELDNAMES, self.to_values()))
+
+    def replace(self, **changes: object) -> "EventEntry":
+        values = dict(zip(FIELDNAMES, self.astuple()))
+        values.update(changes)
+        return EventEntry(**values)
+
+    @classmethod
+    def from_row(cls, row: dict) -> "EventEntry":
+        return cls(
+            date=row.get("date", ""),
+            time=row.get("time", ""),
+            name=row.get("name", ""),
+            flyer=row.get("flyer", ""),
+            url=row.get("url", ""),
+            host=row.get("host", ""),
+            city=row.get("city", ""),
+            region=row.get("region", ""),
+            source=row.get("source", ""),
+            labels=split_cell(row.get("labels", "")),
+            style=split_cell(row.get("style", "")),
+        )
+
+
+def read_csv(path: Path) -> List[EventEntry]:
+    """Events of a CSV, ignoring the padding around headers and cells of hand-edited files."""
+    with path.open("r", newline="", encoding="utf-8") as handle:
+        return [
+            EventEntry.from_row({key.strip(): (value or "").strip() for key, value in row.items()})
+            for row in csv.DictReader(handle)
+        ]
+
+
+def write_events(handle: IO[str], events: Iterable[EventEntry]) -> None:
+    """Write the header and one row per event straight from tuples, without a dict per row."""
+    writer = csv.writer(handle)
+    writer.writerow(FIELDNAMES)
+    writer.writerows(event.to_values() for event in events)
+
+
+def render_events(events: Iterable[EventEntry]) -> str:
+    buffer = io.StringIO()
+    write_events(buffer, events)
+    return buffer.getvalue()
+
+
+def write_csv(events: Iterable[EventEntry], path: Path) -> bool:
+    return write_if_changed(path, render_events(events))
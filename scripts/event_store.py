@@ -0,0 +1,186 @@
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from crawl_settings import EVENT_STORE_PATH, FIELDNAMES
+from dedupe import normalize_name
+from event_entry import EventEntry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL DEFAULT '',
+    events INTEGER NOT NULL DEFAULT 0,
+    added INTEGER NOT NULL DEFAULT 0,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    time TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    flyer TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    host TEXT NOT NULL DEFAULT '',
+    city TEXT NOT NULL DEFAULT '',
+    region TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    style TEXT NOT NULL DEFAULT '',
+    labels TEXT NOT NULL DEFAULT '',
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    first_run INTEGER NOT NULL REFERENCES runs (id),
+    last_run INTEGER NOT NULL REFERENCES runs (id),
+    position INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (date, name_key)
+);
+CREATE INDEX IF NOT EXISTS events_date ON events (date);
+CREATE INDEX IF NOT EXISTS events_region ON events (region, date);
+CREATE INDEX IF NOT EXISTS events_source ON events (source, date);
+CREATE INDEX IF NOT EXISTS events_last_run ON events (last_run, position);
+-- style holds several codes per event, so each code gets its own indexed row.
+CREATE TABLE IF NOT EXISTS event_styles (
+    style TEXT NOT NULL,
+    event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+    PRIMARY KEY (style, event_id)
+) WITHOUT ROWID;
+CREATE VIEW IF NOT EXISTS current_events AS
+    SELECT * FROM events
+    WHERE last_run = (SELECT MAX(id) FROM runs)
+    ORDER BY position;
+"""
+
+
+@dataclass
+class RunSummary:
+    run_id: int
+    events: int
+    added: int
+    removed: int
+
+    def summary(self) -> str:
+        return (
+            f"Event store run {self.run_id}: {self.events} events, "
+            f"{self.added} new, {self.removed} no longer listed"
+        )
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def index_styles(connection: sqlite3.Connection, styles: Sequence[Tuple[int, str]]) -> None:
+    """Replace the event_styles rows of the given (event id, style cell) pairs."""
+    connection.executemany("DELETE FROM event_styles WHERE event_id = ?", [(event_id,) for event_id, _ in styles])
+    connection.executemany(
+        "INSERT OR IGNORE INTO event_styles (style, event_id) VALUES (?, ?)",
+        [(style, event_id) for event_id, cell in styles for style in cell.split("|") if style],
+    )
+
+
+class EventStore:
+    """
+    Every merged event of every run in SQLite, keyed like the merge dedupe
+    (date and normalized name). Each run upserts its events, so a row keeps
+    the time it was first seen while its fields follow the latest listing.
+    The current_events view holds the rows of the latest run in merge order;
+    the published files are rendered from it.
+    """
+
+    def __init__(self, path: Path = EVENT_STORE_PATH) -> None:
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def record_run(self, events: Sequence[EventEntry], today: Optional[date] = None) -> RunSummary:
+        """Upsert the deduplicated events of one run and log the run."""
+        seen = now_iso()
+        connection = self._connect()
+        with connection:
+            previous_run = connection.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+            run_id = connection.execute(
+                "INSERT INTO runs (started_at) VALUES (?)", (seen,)
+            ).lastrowid
+            connection.executemany(
+                """
+                INSERT INTO events (
+                    date, name_key, time, name, flyer, url, host, city, region, source,
+                    style, labels, first_seen, last_seen, first_run, last_run, position
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (date, name_key) DO UPDATE SET
+                    time = excluded.time,
+                    name = excluded.name,
+                    flyer = excluded.flyer,
+                    url = excluded.url,
+                    host = excluded.host,
+                    city = excluded.city,
+                    region = excluded.region,
+                    source = excluded.source,
+                    style = excluded.style,
+                    labels = excluded.labels,
+                    last_seen = excluded.last_seen,
+                    last_run = excluded.last_run,
+                    position = excluded.position
+                """,
+                [
+                    # to_values() starts with the date; the rest are the remaining FIELDNAMES.
+                    (event.date, normalize_name(event.name), *event.to_values()[1:])
+                    + (seen, seen, run_id, run_id, position)
+                    for position, event in enumerate(events)
+                ],
+            )
+            index_styles(
+                connection,
+                connection.execute("SELECT id, style FROM events WHERE last_run = ?", (run_id,)).fetchall(),
+            )
+            added = connection.execute(
+                "SELECT COUNT(*) FROM events WHERE first_run = ?", (run_id,)
+            ).fetchone()[0]
+            # Upcoming events of the previous run that no source lists any more.
+            removed = connection.execute(
+                "SELECT COUNT(*) FROM events WHERE last_run = ? AND date >= ?",
+                (previous_run, (today or date.today()).isoformat()),
+            ).fetchone()[0]
+            connection.execute(
+                "UPDATE runs SET finished_at = ?, events = ?, added = ?, removed = ? WHERE id = ?",
+                (now_iso(), len(events), added, removed, run_id),
+            )
+        connection.close()
+        return RunSummary(run_id, len(events), added, removed)
+
+    def current_events(self) -> List[EventEntry]:
+        connection = self._connect()
+        rows = connection.execute(f"SELECT {', '.join(FIELDNAMES)} FROM current_events")
+        events = [EventEntry.from_row(dict(zip(FIELDNAMES, row))) for row in rows]
+        connection.close()
+        return events
+
+    def stored_events(self) -> Tuple[List[int], List[EventEntry]]:
+        """Row ids and events of the whole archive, past runs included."""
+        connection = self._connect()
+        rows = connection.execute(f"SELECT id, {', '.join(FIELDNAMES)} FROM events ORDER BY id").fetchall()
+        connection.close()
+        return [row[0] for row in rows], [EventEntry.from_row(dict(zip(FIELDNAMES, row[1:]))) for row in rows]
+
+    def update_styles(self, styles: Dict[int, str]) -> None:
+        """Set the style cell of the given row ids, e.g. after reclassification."""
+        if not styles:
+            return
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "UPDATE events SET style = ? WHERE id = ?",
+                [(cell, event_id) for event_id, cell in styles.items()],
+            )
+            index_styles(connection, list(styles.items()))
+        connection.close()
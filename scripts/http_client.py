@@ -0,0 +1,90 @@
+import inspect
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from crawl_settings import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_BACKOFF_JITTER,
+    HTTP_MAX_RETRY_AFTER,
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+    build_headers,
+)
+from instrumentation import METRICS
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def accepted_encodings() -> str:
+    # urllib3 only decodes brotli when one of the brotli packages is installed.
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+    return "gzip, deflate, br"
+
+
+class CappedRetry(Retry):
+    """Retry that waits at most max_retry_after seconds for a Retry-After header."""
+
+    max_retry_after = HTTP_MAX_RETRY_AFTER
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+def build_retry(
+    total: int = HTTP_RETRIES,
+    backoff_factor: float = HTTP_BACKOFF_FACTOR,
+    backoff_jitter: float = HTTP_BACKOFF_JITTER,
+) -> Retry:
+    """
+    Retry connection errors and 429/5xx answers with exponential backoff.
+    Retry-After is honoured for 429 and 503, up to HTTP_MAX_RETRY_AFTER seconds
+    per attempt. Once the retries are used up the
+    last response is returned, so raise_for_status() still reports it.
+    """
+    options = dict(
+        total=total,
+        connect=total,
+        read=total,
+        status=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # backoff_jitter only exists from urllib3 2.0 on.
+    if "backoff_jitter" in inspect.signature(Retry.__init__).parameters:
+        options["backoff_jitter"] = backoff_jitter
+    return CappedRetry(**options)
+
+
+def build_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    A keep-alive session with a connection pool large enough for the crawler's
+    worker threads, the retry policy above and one browser-like header set.
+    Every response is recorded in the run metrics.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=build_retry(),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        build_headers({"Accept-Encoding": accepted_encodings(), "Connection": "keep-alive"})
+    )
+    session.hooks["response"].append(METRICS.record_response)
+    return session
@@ -0,0 +1,70 @@
+import csv
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+FINGERPRINT_FIELDS = ("date", "time", "name", "city", "url", "labels")
+
+
+def event_key(row: dict) -> Tuple[str, str, str, str]:
+    return (row.get("date", ""), row.get("time", ""), row.get("name", ""), row.get("city", ""))
+
+
+def fingerprint(row: dict) -> Tuple[str, ...]:
+    return tuple(row.get(field, "") or "" for field in FINGERPRINT_FIELDS)
+
+
+def load_previous(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with path.open("r", newline="", encoding="utf-8") as handle:
+        return {event_key(row): row for row in csv.DictReader(handle)}
+
+
+@dataclass
+class CrawlDiff:
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    def summary(self, source: str) -> str:
+        return (
+            f"{source}: {self.added} added, {self.changed} changed, "
+            f"{self.unchanged} unchanged, {self.removed} removed"
+        )
+
+
+def reuse_previous_styles(events: Sequence, previous: dict) -> Tuple[List, CrawlDiff]:
+    """
+    Copy the stored style onto every event whose fingerprint matches the
+    previous run and return the events that still need style detection.
+    """
+    diff = CrawlDiff()
+    stale = []
+    current_keys = set()
+    for event in events:
+        row = event.to_row()
+        key = event_key(row)
+        current_keys.add(key)
+        stored = previous.get(key)
+        if stored is None:
+            diff.added += 1
+            stale.append(event)
+        elif fingerprint(stored) != fingerprint(row):
+            diff.changed += 1
+            stale.append(event)
+        else:
+            diff.unchanged += 1
+            event.style = split_cell(stored.get("style", ""))
+    today = date.today().isoformat()
+    diff.removed = sum(
+        1 for key in previous if key not in current_keys and key[0] >= today
+    )
+    return stale, diff
+
+
+def split_cell(value: str) -> List[str]:
+    return [part for part in (value or "").split("|") if part]
+
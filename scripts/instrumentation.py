@@ -0,0 +1,107 @@
+import json
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+from urllib.parse import urlsplit
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Nearest rank: the smallest value with at least fraction of the values at or below it.
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class RunMetrics:
+    """
+    Process-wide stage timers, counters and HTTP request statistics for one
+    crawl run. Safe to use from the crawler worker threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+            self.stages: dict[str, dict] = {}
+            self.counters: Counter = Counter()
+            self.latencies: List[float] = []
+            self.bytes_downloaded = 0
+            self.caches: dict[str, dict] = {}
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0})
+                entry["seconds"] += elapsed
+                entry["calls"] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_cache(self, name: str, hits: int, misses: int, **extra: int) -> None:
+        with self._lock:
+            self.caches[name] = {"hits": hits, "misses": misses, **extra}
+
+    def record_response(self, response, *args, **kwargs) -> None:
+        """requests response hook: latency to headers, body size and status per host."""
+        size = len(response.content or b"")
+        host = urlsplit(response.url).netloc
+        with self._lock:
+            self.latencies.append(response.elapsed.total_seconds())
+            self.bytes_downloaded += size
+            self.counters["http.requests"] += 1
+            self.counters[f"http.requests.{host}"] += 1
+            self.counters[f"http.status.{response.status_code}"] += 1
+
+    def report(self) -> dict:
+        with self._lock:
+            caches = {}
+            for name, stats in self.caches.items():
+                lookups = stats["hits"] + stats["misses"]
+                caches[name] = {**stats, "hit_rate": round(stats["hits"] / lookups, 4) if lookups else None}
+            p50 = percentile(self.latencies, 0.5)
+            p95 = percentile(self.latencies, 0.95)
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "total_seconds": round(time.perf_counter() - self._started, 3),
+                "stages": {
+                    name: {"seconds": round(entry["seconds"], 3), "calls": entry["calls"]}
+                    for name, entry in sorted(self.stages.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "http": {
+                    "requests": len(self.latencies),
+                    "bytes_downloaded": self.bytes_downloaded,
+                    "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                    "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                },
+                "caches": caches,
+            }
+
+    def write_report(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as handle:
+            json.dump(self.report(), handle, indent=2)
+            handle.write("\n")
+
+
+METRICS = RunMetrics()
+timer = METRICS.timer
+count = METRICS.count
@@ -0,0 +1,24 @@
+import re
+from typing import Iterable, List, Optional
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+LABEL_REPLACEMENTS = {
+    "social dance": "party",
+    "bachata party schweiz": "party",
+}
+
+
+def clean_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return WHITESPACE_PATTERN.sub(" ", value).strip()
+
+
+def normalize_labels(raw_labels: Iterable[str]) -> List[str]:
+    normalized: List[str] = []
+    for label in raw_labels:
+        value = label.lower().strip()
+        value = LABEL_REPLACEMENTS.get(value, value)
+        if value and value not in normalized:
+            normalized.append(value)
+    return normalized
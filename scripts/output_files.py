@@ -0,0 +1,35 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Union
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_if_changed(path: Path, content: Union[str, bytes]) -> bool:
+    """
+    Replace path with content unless it already holds exactly these bytes.
+    The new file is written next to the old one and renamed over it, so
+    readers never see a half-written file. Returns whether it was written.
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as temp_file:
+            temp_file.write(data)
+        # mkstemp creates the file private to the user; published files are world-readable.
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return True
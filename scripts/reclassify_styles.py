@@ -0,0 +1,90 @@
+"""
+Re-run style detection over the stored events after the keyword lists changed,
+using the detail texts kept in the detail cache instead of crawling again.
+"""
+import argparse
+import os
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from crawl_all_events import PUBLIC_SERIES_PATH, write_all_events
+from crawl_settings import DATA_DIR, EVENT_STORE_PATH
+from detail_cache import DetailCache
+from event_entry import EventEntry, read_csv, style_cell, write_csv
+from event_store import EventStore
+from style_detection import detect_styles_batch
+
+# The per-site CSVs are the baseline of incremental runs; the merged files
+# are rendered from the event store.
+SITE_CSV_PATHS = [
+    DATA_DIR / "events_latino_ch.csv",
+    DATA_DIR / "events-bachata-bern.csv",
+]
+
+
+def restyle(events: Sequence[EventEntry], cache: DetailCache, workers: int) -> Tuple[List[int], int]:
+    """
+    Re-detect the styles of events in place. Returns the positions of the
+    changed events and how many were skipped for lack of a cached text.
+    """
+    # Without the detail text an event would lose styles only found there; leave it alone.
+    positions = [
+        position for position, event in enumerate(events) if not event.url or cache.has_text(event.url)
+    ]
+    candidates = [events[position] for position in positions]
+    styles = detect_styles_batch(
+        ((event.name, event.labels, cache.text(event.url), event.host) for event in candidates),
+        workers=workers,
+    )
+    changed = []
+    for position, style in zip(positions, styles):
+        event = events[position]
+        before = style_cell(event.style)
+        event.style = style
+        if style_cell(event.style) != before:
+            changed.append(position)
+    return changed, len(events) - len(positions)
+
+
+def reclassify_csv(path: Path, cache: DetailCache, workers: int) -> Tuple[int, int]:
+    """Return how many rows changed and how many were skipped for lack of a cached text."""
+    events = read_csv(path)
+    changed, skipped = restyle(events, cache, workers)
+    if changed:
+        write_csv(events, path)
+    return len(changed), skipped
+
+
+def reclassify_store(store: EventStore, cache: DetailCache, workers: int) -> Tuple[int, int]:
+    """Restyle every stored event, past runs included, and update the style index."""
+    ids, events = store.stored_events()
+    changed, skipped = restyle(events, cache, workers)
+    store.update_styles({ids[position]: style_cell(events[position].style) for position in changed})
+    return len(changed), skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, default=SITE_CSV_PATHS)
+    parser.add_argument("--store", type=Path, default=EVENT_STORE_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    cache = DetailCache()
+    for path in args.paths:
+        if not path.exists():
+            continue
+        changed, skipped = reclassify_csv(path, cache, args.workers)
+        print(f"Updated the style of {changed} events in {path} ({skipped} without cached detail text)")
+    if not args.store.exists():
+        print(f"No event store at {args.store}; run crawl_all_events.py to create it")
+        return
+    store = EventStore(args.store)
+    changed, skipped = reclassify_store(store, cache, args.workers)
+    print(f"Updated the style of {changed} events in {args.store} ({skipped} without cached detail text)")
+    # Every published file is a view of the store, so all of them are re-rendered.
+    written = write_all_events(store.current_events(), series=PUBLIC_SERIES_PATH.exists())
+    print(f"Rewrote {written} published files")
+
+
+if __name__ == "__main__":
+    main()
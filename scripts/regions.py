@@ -0,0 +1,86 @@
+import json
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+REGIONS_PATH = Path(__file__).with_name("regions.json")
+POSTCODE_PATTERN = re.compile(r"(\d{4})")
+
+
+class RegionIndex:
+    """
+    Maps free-form city text to a macro-region. City keywords are checked as
+    substrings in priority order (first listed wins), postcodes via a sorted
+    range table; anything else falls back to the default region.
+    """
+
+    def __init__(
+        self,
+        cities: Sequence[Tuple[str, str]],
+        postcodes: Sequence[Tuple[int, Optional[int], str]],
+        default_region: str,
+    ) -> None:
+        self.default_region = default_region
+        self.needles = [needle for needle, _ in cities]
+        self.regions = [region for _, region in cities]
+        self.priority = {}
+        for position, needle in enumerate(self.needles):
+            self.priority.setdefault(needle, position)
+        # A zero-width alternation reports every keyword start in a single scan;
+        # at each position the earliest listed keyword is tried first.
+        alternation = "|".join(re.escape(needle) for needle in self.needles)
+        self.pattern = re.compile(f"(?=({alternation}))")
+        ranges = sorted(postcodes, key=lambda item: item[0])
+        self.range_starts = [start for start, _, _ in ranges]
+        self.ranges = ranges
+        self.exact = {needle: self._scan(needle) for needle in self.needles}
+
+    @classmethod
+    def load(cls, path: Path = REGIONS_PATH) -> "RegionIndex":
+        with path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return cls(
+            [tuple(item) for item in data["cities"]],
+            [tuple(item) for item in data["postcodes"]],
+            data["default_region"],
+        )
+
+    def _scan(self, lc: str) -> Optional[str]:
+        best: Optional[int] = None
+        for match in self.pattern.finditer(lc):
+            position = self.priority[match.group(1)]
+            if best is None or position < best:
+                best = position
+                if best == 0:
+                    break
+        return self.regions[best] if best is not None else None
+
+    def _postcode_region(self, city_text: str) -> Optional[str]:
+        match = POSTCODE_PATTERN.search(city_text)
+        if not match:
+            return None
+        plz = int(match.group(1))
+        position = bisect_right(self.range_starts, plz) - 1
+        if position < 0:
+            return None
+        _, end, region = self.ranges[position]
+        if end is not None and plz >= end:
+            return None
+        return region
+
+    def resolve(self, city_text: str) -> str:
+        if not city_text:
+            return self.default_region
+        lc = city_text.lower()
+        region = self.exact.get(lc) or self._scan(lc) or self._postcode_region(city_text)
+        return region or self.default_region
+
+
+REGION_INDEX = RegionIndex.load()
+
+
+@lru_cache(maxsize=4096)
+def determine_region(city_text: str) -> str:
+    return REGION_INDEX.resolve(city_text)
@@ -0,0 +1,107 @@
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from crawl_settings import FIELDNAMES
+from dedupe import normalize_name
+from event_entry import EventEntry
+
+SERIES_VERSION = 1
+# Two dates are always "regular"; a series needs a third occurrence to show its rhythm.
+SERIES_MIN_OCCURRENCES = 3
+# Fields besides date and url that all occurrences must share to be written as one series.
+TEMPLATE_FIELDS = ("time", "name", "flyer", "host", "city", "region", "source", "style", "labels")
+
+
+@dataclass
+class Series:
+    """Occurrences of one recurring event, by date, with the days between them."""
+
+    events: List[EventEntry]
+    interval_days: int
+
+    @property
+    def latest(self) -> EventEntry:
+        return self.events[-1]
+
+
+def series_key(event: EventEntry) -> tuple:
+    return (normalize_name(event.name), event.host.lower(), event.city.lower(), event.time)
+
+
+def regular_interval(dates: Sequence[str]) -> Optional[int]:
+    """The gap in days if the dates are distinct and evenly spaced, else None."""
+    days = sorted(date.fromisoformat(value).toordinal() for value in dates)
+    if len(days) < SERIES_MIN_OCCURRENCES or len(set(days)) != len(days):
+        return None
+    gaps = {later - earlier for earlier, later in zip(days, days[1:])}
+    return gaps.pop() if len(gaps) == 1 else None
+
+
+def detect_series(events: Iterable[EventEntry]) -> List[Series]:
+    """
+    Events with the same normalized name, host, city and time that recur at a
+    fixed interval. Groups with a skipped or extra date are not a series.
+    """
+    groups: Dict[tuple, List[EventEntry]] = {}
+    for event in events:
+        if event.date:
+            groups.setdefault(series_key(event), []).append(event)
+    found = []
+    for members in groups.values():
+        interval = regular_interval([event.date for event in members])
+        if interval:
+            found.append(Series(sorted(members, key=lambda event: event.date), interval))
+    return found
+
+
+def url_template(events: Sequence[EventEntry]) -> Optional[str]:
+    """The url with the date replaced by {date}, if that reproduces every occurrence's url."""
+    first = events[0]
+    if not first.url or first.date not in first.url:
+        return None
+    template = first.url.replace(first.date, "{date}")
+    if all(event.url == template.replace("{date}", event.date) for event in events):
+        return template
+    return None
+
+
+def build_series_export(events: Iterable[EventEntry]) -> dict:
+    """
+    The events with every series written once: a template row, the interval
+    and the occurrence dates. Occurrence urls are a {date} template when they
+    only differ by date. Series whose occurrences differ in any other field
+    stay as single events, so the export holds exactly the input events.
+    """
+    events = list(events)
+    collapsed = set()
+    series_rows = []
+    for series in detect_series(events):
+        template = series.events[0].to_row()
+        rows = [event.to_row() for event in series.events]
+        if any(row[field] != template[field] for row in rows for field in TEMPLATE_FIELDS):
+            continue
+        collapsed.update(id(event) for event in series.events)
+        entry = {field: template[field] for field in TEMPLATE_FIELDS}
+        shared_url = url_template(series.events)
+        if shared_url is not None:
+            entry["url"] = shared_url
+        else:
+            entry["urls"] = [row["url"] for row in rows]
+        entry["interval_days"] = series.interval_days
+        entry["dates"] = [row["date"] for row in rows]
+        series_rows.append(entry)
+    series_rows.sort(key=lambda entry: (entry["dates"][0], entry["time"], entry["name"].lower()))
+    return {
+        "version": SERIES_VERSION,
+        "count": len(events),
+        "series": series_rows,
+        # Remaining events as value lists in FIELDNAMES order, like the CSV rows.
+        "fields": FIELDNAMES,
+        "events": [list(event.to_values()) for event in events if id(event) not in collapsed],
+    }
+
+
+def render_series(events: Iterable[EventEntry]) -> bytes:
+    return json.dumps(build_series_export(events), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
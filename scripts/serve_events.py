@@ -0,0 +1,272 @@
+"""
+Serve the merged events as a small JSON API, filtered by region, label,
+style and date range, from indexes held in memory.
+
+    python3 scripts/serve_events.py --port 8000
+    curl 'http://localhost:8000/events?region=Region%20Z%C3%BCrich&style=S&from=2025-12-01&to=2025-12-07'
+"""
+import argparse
+import bisect
+import gzip
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from crawl_settings import ALL_EVENTS_PATH, EVENT_STORE_PATH
+from compact_export import build_filter_index, ordered_events
+from event_entry import EventEntry, read_csv
+from event_store import EventStore
+from output_files import content_hash
+
+QUERY_FILTERS = ("region", "label", "style")
+QUERY_PARAMETERS = QUERY_FILTERS + ("from", "to")
+# Same meaning as the frontend's label filter: everything except pure courses and shops.
+LABEL_WITHOUT_COURSES = "ohne-kurse"
+COURSE_LABEL_SETS = ("kurs", "shopping")
+RESPONSE_CACHE_SIZE = 256
+MIN_GZIP_BYTES = 1024
+RELOAD_CHECK_SECONDS = 30
+
+QueryKey = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+class QueryError(ValueError):
+    """Raised for query parameters the API does not understand; answered with 400."""
+
+
+def load_events(store_path: Path = EVENT_STORE_PATH, csv_path: Path = ALL_EVENTS_PATH) -> List[EventEntry]:
+    if store_path.exists():
+        return EventStore(store_path).current_events()
+    return read_csv(csv_path)
+
+
+def parse_day(value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise QueryError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+def query_key(query: str) -> QueryKey:
+    """The query parameters in a canonical order, so equivalent URLs share a cache entry and ETag."""
+    params = parse_qs(query, keep_blank_values=False)
+    unknown = sorted(set(params) - set(QUERY_PARAMETERS))
+    if unknown:
+        raise QueryError(f"Unknown parameter {unknown[0]!r}")
+    for name in ("from", "to"):
+        if len(params.get(name, ())) > 1:
+            raise QueryError(f"Parameter {name!r} may only be given once")
+        if name in params:
+            params[name] = [parse_day(params[name][0])]
+    return tuple((name, tuple(sorted(set(params[name])))) for name in QUERY_PARAMETERS if name in params)
+
+
+class EventDataset:
+    """
+    The events in the compact export's row order with the filter index over
+    them. A filter is a union of index lists per parameter, intersected across
+    parameters; the date range becomes a row range because rows are sorted
+    by date. Rendered responses are kept per query.
+    """
+
+    def __init__(self, events: List[EventEntry]) -> None:
+        self.events = ordered_events(events)
+        self.index = build_filter_index(self.events)
+        self.dates = [event.date for event in self.events]
+        self.rows = [event.to_row() for event in self.events]
+        self.version = content_hash(
+            json.dumps(self.rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )[:16]
+        self.responses: "OrderedDict[QueryKey, Tuple[bytes, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def etag(self, key: QueryKey) -> str:
+        # Known before any filtering, so a matching If-None-Match costs one hash.
+        return '"' + content_hash(f"{self.version}|{key!r}".encode("utf-8"))[:24] + '"'
+
+    def filter_rows(self, key: QueryKey) -> List[int]:
+        params = dict(key)
+        start = bisect.bisect_left(self.dates, params["from"][0]) if "from" in params else 0
+        end = bisect.bisect_right(self.dates, params["to"][0]) if "to" in params else len(self.dates)
+        rows: Optional[set] = None
+        for name in QUERY_FILTERS:
+            if name not in params:
+                continue
+            matches = set()
+            for value in params[name]:
+                if name == "label" and value == LABEL_WITHOUT_COURSES:
+                    for label_set, ids in self.index["label_set"].items():
+                        if label_set not in COURSE_LABEL_SETS:
+                            matches.update(ids)
+                else:
+                    matches.update(self.index[name].get(value, ()))
+            rows = matches if rows is None else rows & matches
+        if rows is None:
+            return list(range(start, end))
+        return sorted(row for row in rows if start <= row < end)
+
+    def response(self, key: QueryKey) -> Tuple[bytes, bytes]:
+        """Plain and gzip-compressed JSON body for the query."""
+        with self._lock:
+            cached = self.responses.get(key)
+            if cached:
+                self.responses.move_to_end(key)
+                return cached
+        rows = self.filter_rows(key)
+        body = json.dumps(
+            {"version": self.version, "count": len(rows), "events": [self.rows[row] for row in rows]},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+        with self._lock:
+            self.responses[key] = (body, compressed)
+            while len(self.responses) > RESPONSE_CACHE_SIZE:
+                self.responses.popitem(last=False)
+        return body, compressed
+
+    def filters(self) -> Dict[str, Dict[str, int]]:
+        """Available filter values with their event counts."""
+        return {name: {value: len(ids) for value, ids in self.index[name].items()} for name in QUERY_FILTERS}
+
+
+class EventServer(ThreadingHTTPServer):
+    """Holds the dataset and rebuilds it when the store or CSV it came from changes."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], store_path: Path, csv_path: Path) -> None:
+        super().__init__(address, EventRequestHandler)
+        self.store_path = store_path
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._source_mtime: Optional[float] = None
+        self.dataset = self.load()
+        if not self.dataset.events:
+            self.server_close()
+            raise SystemExit(f"No dated events in {self.source_path}")
+
+    @property
+    def source_path(self) -> Path:
+        return self.store_path if self.store_path.exists() else self.csv_path
+
+    def source_mtime(self) -> Optional[float]:
+        path = self.source_path
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def load(self) -> EventDataset:
+        self._source_mtime = self.source_mtime()
+        dataset = EventDataset(load_events(self.store_path, self.csv_path))
+        print(f"Serving {len(dataset.events)} events, version {dataset.version}")
+        return dataset
+
+    def current_dataset(self) -> EventDataset:
+        now = time.monotonic()
+        if now - self._checked_at >= RELOAD_CHECK_SECONDS:
+            with self._lock:
+                if now - self._checked_at >= RELOAD_CHECK_SECONDS:
+                    self._checked_at = now
+                    if self.source_mtime() != self._source_mtime:
+                        dataset = self.load()
+                        # A store or CSV caught mid-rewrite; keep answering from the last good one.
+                        if dataset.events:
+                            self.dataset = dataset
+                        else:
+                            print(f"No dated events in {self.source_path}; keeping version {self.dataset.version}")
+        return self.dataset
+
+
+class EventRequestHandler(BaseHTTPRequestHandler):
+    server: EventServer
+    # HEAD answers like GET without the body, so clients can revalidate cheaply.
+    head_only = False
+
+    def do_HEAD(self) -> None:
+        self.head_only = True
+        self.do_GET()
+
+    def write_body(self, payload: bytes) -> None:
+        if not self.head_only:
+            self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        dataset = self.server.current_dataset()
+        if url.path == "/events":
+            try:
+                key = query_key(url.query)
+            except QueryError as exc:
+                self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+                return
+            etag = dataset.etag(key)
+            if etag in self.headers.get("If-None-Match", ""):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_common_headers(etag)
+                self.end_headers()
+                return
+            body, compressed = dataset.response(key)
+            self.send_body(body, compressed, etag)
+        elif url.path == "/filters":
+            self.send_json(HTTPStatus.OK, {"version": dataset.version, **dataset.filters()})
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def send_common_headers(self, etag: str) -> None:
+        self.send_header("ETag", etag)
+        # Clients may keep responses but must revalidate; unchanged data costs a 304.
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def send_body(self, body: bytes, compressed: bytes, etag: str) -> None:
+        use_gzip = len(body) >= MIN_GZIP_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+        payload = compressed if use_gzip else body
+        self.send_response(HTTPStatus.OK)
+        self.send_common_headers(etag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.write_body(payload)
+
+    def send_json(self, status: HTTPStatus, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.write_body(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--store", type=Path, default=EVENT_STORE_PATH)
+    parser.add_argument("--csv", type=Path, default=ALL_EVENTS_PATH, help="used when the store does not exist")
+    args = parser.parse_args()
+    server = EventServer((args.host, args.port), args.store, args.csv)
+    print(f"Listening on http://{args.host}:{args.port}/events")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import re
-from typing import Iterable, List, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 VALID_STYLE_CODES = {"S", "B", "K", "Z"}
 
@@ -39,7 +40,15 @@ STYLE_KEYWORDS = {
     ],
 }
 
-# Combined abbreviations that frequently appear in titles.
+# Below this many events a process pool costs more than it saves.
+BATCH_PARALLEL_THRESHOLD = 2000
+
+# (name, labels, detail_text, host), the positional arguments of detect_styles.
+StyleInput = Tuple[str, Optional[Sequence[str]], Optional[str], Optional[str]]
+
+# Combined abbreviations that frequently appear in titles. Only matched against
+# the name and labels: as two-letter tokens they also occur in addresses and
+# prose ("Pfäffikon SZ", "BZ" for Berner Zeitung).
 COMBINATION_PATTERNS = [
     (["S", "B", "K", "Z"], r"\bsbkz\b"),
     (["S", "B", "K"], r"\bsbk\b"),
@@ -50,6 +59,63 @@ COMBINATION_PATTERNS = [
 ]
 
 
+def literal_first(pattern: str) -> str:
+    r"""
+    Rewrite a leading \b as a lookbehind after the literal prefix, e.g.
+    \bsalsa -> salsa(?<=\bsalsa). Patterns that start with a literal are located
+    with a fast substring search instead of being tried at every position.
+    """
+    if not pattern.startswith(r"\b"):
+        return pattern
+    rest = pattern[2:]
+    prefix = re.match(r"[a-z0-9]+", rest)
+    if not prefix:
+        return pattern
+    literal = prefix.group(0)
+    if rest[len(literal) : len(literal) + 1] in ("+", "*", "?", "{"):
+        # The quantifier binds to the last character, keep it out of the prefix.
+        literal = literal[:-1]
+    if not literal:
+        return pattern
+    return rf"{literal}(?<=\b{literal}){rest[len(literal):]}"
+
+
+class StyleMatcher:
+    """Precompiled keyword and combination patterns for detect_styles."""
+
+    def __init__(
+        self,
+        keywords: Optional[dict] = None,
+        combinations: Optional[Sequence[Tuple[List[str], str]]] = None,
+    ) -> None:
+        keywords = STYLE_KEYWORDS if keywords is None else keywords
+        combinations = COMBINATION_PATTERNS if combinations is None else combinations
+        self.keywords = [
+            (code, [re.compile(literal_first(pattern)) for pattern in patterns])
+            for code, patterns in keywords.items()
+        ]
+        self.combinations = [
+            (set(codes), re.compile(literal_first(pattern))) for codes, pattern in combinations
+        ]
+        self.all_codes = {code for code, _ in self.keywords}
+        for codes, _ in self.combinations:
+            self.all_codes |= codes
+
+    def match(self, folded: str, title: Optional[str] = None) -> List[str]:
+        """Codes found in folded; the combinations only look at title when it is given."""
+        title = folded if title is None else title
+        found: set[str] = set()
+        for code, patterns in self.keywords:
+            if any(pattern.search(folded) for pattern in patterns):
+                found.add(code)
+        for codes, pattern in self.combinations:
+            if found >= self.all_codes:
+                break
+            if not codes <= found and pattern.search(title):
+                found |= codes
+        return normalize_styles(found)
+
+
 def normalize_styles(styles: Iterable[str]) -> List[str]:
     unique = []
     for style in styles:
@@ -69,24 +135,43 @@ def detect_styles(
     Try to infer the dance styles an event covers from its name, labels and,
     when available, the detail page contents.
     """
-    text_parts = [
-        name or "",
-        " ".join(labels or []),
-        detail_text or "",
-        host or "",
-    ]
-    haystack = " ".join(text_parts)
-    folded = re.sub(r"\s+", " ", haystack).lower()
+    # Keywords only use \s* between words, so whitespace runs need no folding.
+    title = " ".join([name or "", " ".join(labels or [])]).lower()
+    folded = " ".join([title, (detail_text or "").lower(), (host or "").lower()])
+    return DEFAULT_MATCHER.match(folded, title)
 
-    styles: list[str] = []
 
-    for style_code, patterns in STYLE_KEYWORDS.items():
-        for pattern in patterns:
-            if re.search(pattern, folded):
-                styles.append(style_code)
-                break
+DEFAULT_MATCHER = StyleMatcher()
+
+
+def _detect_item(item: StyleInput) -> List[str]:
+    return detect_styles(*item)
 
-    return normalize_styles(styles)
+
+def detect_styles_batch(
+    items: Iterable[StyleInput],
+    workers: int = 0,
+    chunksize: int = 256,
+) -> List[List[str]]:
+    """
+    Run detect_styles over many events, returning the results in input order.
+    Identical inputs, such as the occurrences of a weekly event, are only
+    classified once. With workers > 1 large batches are spread over a
+    process pool.
+    """
+    keys = [
+        (name, tuple(labels or ()), detail_text, host) for name, labels, detail_text, host in items
+    ]
+    unique = list(dict.fromkeys(keys))
+    if workers > 1 and len(unique) >= BATCH_PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_detect_item, unique, chunksize=chunksize))
+    else:
+        results = [detect_styles(*item) for item in unique]
+    if len(unique) == len(keys):
+        return results
+    by_key = dict(zip(unique, results))
+    return [list(by_key[key]) for key in keys]
 
 
 def styles_to_cell(styles: Iterable[str]) -> str:
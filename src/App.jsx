@@ -24,10 +24,24 @@ const TODAY = (() => {
 })()
 
 const INITIAL_VISIBLE_DAYS = 14
-const EVENTS_CSV_URL =
-  (typeof window !== 'undefined' && window.location.hostname === 'localhost')
-    ? '/events.csv'
-    : 'https://raw.githubusercontent.com/aendu/latin-events-be/refs/heads/main/public/events.csv'
+const IS_LOCALHOST = typeof window !== 'undefined' && window.location.hostname === 'localhost'
+const EVENTS_CSV_URL = IS_LOCALHOST
+  ? '/events.csv'
+  : 'https://raw.githubusercontent.com/aendu/latin-events-be/refs/heads/main/public/events.csv'
+const EVENTS_COMPACT_URL = IS_LOCALHOST
+  ? '/events.json.gz'
+  : 'https://raw.githubusercontent.com/aendu/latin-events-be/refs/heads/main/public/events.json.gz'
+const EVENTS_INDEX_URL = IS_LOCALHOST
+  ? '/events.index.json'
+  : 'https://raw.githubusercontent.com/aendu/latin-events-be/refs/heads/main/public/events.index.json'
+const EVENTS_SHARDS_URL = IS_LOCALHOST
+  ? '/shards/'
+  : 'https://raw.githubusercontent.com/aendu/latin-events-be/refs/heads/main/public/shards/'
+const EVENTS_META_URL = IS_LOCALHOST
+  ? '/events.meta.json'
+  : 'https://raw.githubusercontent.com/aendu/latin-events-be/refs/heads/main/public/events.meta.json'
+const COMPACT_VERSION = 1
+const DAY_MS = 24 * 60 * 60 * 1000
 
 const INITIAL_FILTERS = {
   region: 'Region Bern',
@@ -76,8 +90,157 @@ function normalizeRow(row) {
   }
 }
 
+function splitCell(value) {
+  return value ? value.split('|').filter(Boolean) : []
+}
+
+function offsetDate(baseDate, offset) {
+  const date = new Date(`${baseDate}T00:00:00Z`)
+  date.setUTCDate(date.getUTCDate() + offset)
+  return date.toISOString().slice(0, 10)
+}
+
+// Decodes public/events.json.gz (scripts/compact_export.py). Rows arrive sorted by date and time.
+function decodeCompactEvents(data) {
+  if (data.version !== COMPACT_VERSION) {
+    throw new Error(`Unsupported events format ${data.version}`)
+  }
+  const { columns, dictionaries } = data
+  const labelSets = dictionaries.labels.map(splitCell)
+  const styleSets = dictionaries.style.map(splitCell)
+  const events = []
+  data.days.forEach(([offset, start, count]) => {
+    const date = offsetDate(data.base_date, offset)
+    const dateObj = new Date(`${date}T00:00:00`)
+    for (let row = start; row < start + count; row += 1) {
+      events.push({
+        date,
+        dateObj,
+        time: dictionaries.time[columns.time[row]],
+        name: columns.name[row],
+        flyer: columns.flyer[row],
+        url: columns.url[row],
+        host: dictionaries.host[columns.host[row]],
+        city: dictionaries.city[columns.city[row]],
+        region: dictionaries.region[columns.region[row]],
+        source: dictionaries.source[columns.source[row]],
+        labels: labelSets[columns.labels[row]],
+        styles: styleSets[columns.style[row]],
+      })
+    }
+  })
+  return events
+}
+
+async function fetchCompactEvents(url) {
+  const response = await fetch(url)
+  if (!response.ok) {
+    throw new Error(`HTTP ${response.status}`)
+  }
+  const bytes = new Uint8Array(await response.arrayBuffer())
+  let text
+  // Some servers already send the file with Content-Encoding: gzip and the browser unpacks it.
+  if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'))
+    text = await new Response(stream).text()
+  } else {
+    text = new TextDecoder().decode(bytes)
+  }
+  return decodeCompactEvents(JSON.parse(text))
+}
+
+async function fetchVersionedJson(url) {
+  const response = await fetch(url)
+  if (!response.ok) {
+    throw new Error(`HTTP ${response.status}`)
+  }
+  const data = await response.json()
+  if (data.version !== COMPACT_VERSION) {
+    throw new Error(`Unsupported format ${data.version} in ${url}`)
+  }
+  return data
+}
+
+// Hash over all published data files (scripts/crawl_all_events.py), used as cache buster.
+async function fetchDataVersion() {
+  try {
+    const response = await fetch(`${EVENTS_META_URL}?t=${Date.now()}`, { cache: 'no-store' })
+    if (!response.ok) {
+      return ''
+    }
+    const meta = await response.json()
+    return meta.hash ? meta.hash.slice(0, 16) : ''
+  } catch {
+    return ''
+  }
+}
+
+function intersectSorted(a, b) {
+  const result = []
+  let i = 0
+  let j = 0
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      result.push(a[i])
+      i += 1
+      j += 1
+    } else if (a[i] < b[j]) {
+      i += 1
+    } else {
+      j += 1
+    }
+  }
+  return result
+}
+
+function unionSorted(lists) {
+  return Array.from(new Set(lists.flat())).sort((a, b) => a - b)
+}
+
+function firstRowFrom(index, startDate) {
+  const startOffset = Math.round(
+    (Date.parse(`${startDate}T00:00:00Z`) - Date.parse(`${index.base_date}T00:00:00Z`)) / DAY_MS
+  )
+  if (Number.isNaN(startOffset)) {
+    return 0
+  }
+  const day = index.days.find(([offset]) => offset >= startOffset)
+  return day ? day[1] : index.count
+}
+
+// Row ids matching the filters, from public/events.index.json (same row order as events.json.gz).
+function filterRowIds(index, filters) {
+  let ids = null
+  const narrow = (rows) => {
+    ids = ids === null ? rows || [] : intersectSorted(ids, rows || [])
+  }
+  if (filters.region !== 'all') {
+    narrow(index.region[filters.region])
+  }
+  if (filters.style !== 'all') {
+    narrow(index.style[filters.style])
+  }
+  if (filters.label === 'ohne-kurse') {
+    narrow(
+      unionSorted(
+        Object.entries(index.label_set)
+          .filter(([labelSet]) => labelSet !== 'kurs' && labelSet !== 'shopping')
+          .map(([, rows]) => rows)
+      )
+    )
+  } else if (filters.label !== 'all') {
+    narrow(index.label[filters.label])
+  }
+  const firstRow = filters.startDate ? firstRowFrom(index, filters.startDate) : 0
+  if (ids === null) {
+    return Array.from({ length: index.count - firstRow }, (_, offset) => firstRow + offset)
+  }
+  return ids.filter((row) => row >= firstRow)
+}
+
 function App() {
   const [events, setEvents] = useState([])
+  const [filterIndex, setFilterIndex] = useState(null)
   const [filters, setFilters] = useState(INITIAL_FILTERS)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
@@ -94,6 +257,7 @@ function App() {
         setLoading(true)
       }
       setError('')
+      setFilterIndex(null)
       const csvUrl = cacheBust ? `${EVENTS_CSV_URL}?v=${cacheBust}` : EVENTS_CSV_URL
       Papa.parse(csvUrl, {
         download: true,
@@ -121,9 +285,59 @@ function App() {
     []
   )
 
+  const loadEvents = useCallback(
+    async ({ cacheBust = '', silent = false } = {}) => {
+      if (typeof DecompressionStream === 'undefined') {
+        loadCsvEvents({ cacheBust: cacheBust || (await fetchDataVersion()), silent })
+        return
+      }
+      if (!silent) {
+        setLoading(true)
+      }
+      setError('')
+      const version = cacheBust || (await fetchDataVersion())
+      const query = version ? `?v=${version}` : ''
+      // Without the index the filters scan all rows, so a failed download is not an error.
+      const indexRequest = fetchVersionedJson(`${EVENTS_INDEX_URL}${query}`).catch(() => null)
+      const showAll = async (loaded) => {
+        const index = await indexRequest
+        setFilterIndex(index && index.count === loaded.length ? index : null)
+        setEvents(loaded)
+        setLoading(false)
+      }
+      try {
+        // Weekly shards: show the current week first, then the rest. Shard names carry
+        // their content hash, so unchanged weeks come from the browser cache.
+        const manifest = await fetchVersionedJson(`${EVENTS_SHARDS_URL}manifest.json${query}`)
+        const { shards } = manifest
+        const firstShard = Math.max(0, shards.findIndex((shard) => shard.end >= TODAY))
+        const current = await fetchCompactEvents(`${EVENTS_SHARDS_URL}${shards[firstShard].file}`)
+        setFilterIndex(null)
+        setEvents(current)
+        setLoading(false)
+        const parts = await Promise.all(
+          shards.map((shard, position) =>
+            position === firstShard ? current : fetchCompactEvents(`${EVENTS_SHARDS_URL}${shard.file}`)
+          )
+        )
+        await showAll(parts.flat())
+        return
+      } catch (err) {
+        console.warn('Event shards could not be loaded, loading the full file', err)
+      }
+      try {
+        await showAll(await fetchCompactEvents(`${EVENTS_COMPACT_URL}${query}`))
+      } catch (err) {
+        console.warn('Compact events could not be loaded, falling back to CSV', err)
+        loadCsvEvents({ cacheBust: version, silent })
+      }
+    },
+    [loadCsvEvents]
+  )
+
   useEffect(() => {
-    loadCsvEvents()
-  }, [loadCsvEvents])
+    loadEvents()
+  }, [loadEvents])
 
   const regions = useMemo(() => {
     const list = Array.from(new Set(events.map((event) => event.region).filter(Boolean)))
@@ -168,6 +382,9 @@ function App() {
     if (!events.length) {
       return []
     }
+    if (filterIndex) {
+      return filterRowIds(filterIndex, filters).map((row) => events[row])
+    }
     const start = filters.startDate ? new Date(`${filters.startDate}T00:00:00`) : null
 
     return events.filter((event) => {
@@ -194,7 +411,7 @@ function App() {
       }
       return true
     })
-  }, [events, filters])
+  }, [events, filterIndex, filters])
 
   const visibleWindowEnd = useMemo(() => {
     if (!filters.startDate) {